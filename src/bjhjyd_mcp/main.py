@@ -30,6 +30,9 @@ Examples:
   # Enable debug logging
   python -m bjhjyd_mcp.main --log-level DEBUG
 
+  # Serve with 4 worker processes
+  python -m bjhjyd_mcp.main --workers 4
+
   # Use custom data directory
   python -m bjhjyd_mcp.main --data-dir /path/to/data
         """
@@ -48,6 +51,17 @@ Examples:
         help="Port to bind the server to (default: 8000)"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Number of worker processes (default: 1). Workers share the data "
+            "directory; results refreshed through one worker are seen by the "
+            "others on their next search"
+        )
+    )
+    
     parser.add_argument(
         "--data-dir",
         type=Path,
@@ -88,6 +102,7 @@ Examples:
         run_server(
             host=args.host,
             port=args.port,
+            workers=args.workers,
             data_dir=args.data_dir,
             downloads_dir=args.downloads_dir
         )
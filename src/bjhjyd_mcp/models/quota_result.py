@@ -6,12 +6,20 @@ Based on the PDF format analysis, there are two main types of data:
 2. Score Ranking (积分排序入围名单) - Complex score-based ranking with personal info
 """
 
+import sys
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, ClassVar, Set
 from pydantic import BaseModel, Field
 
 
+def _as_datetime(value: Any) -> Optional[datetime]:
+    """Convert a stored ISO datetime string back to a datetime."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
 class QuotaType(str, Enum):
     """Types of quota lottery results."""
     WAITING_LIST = "waiting_list"  # 轮候序号列表
@@ -19,7 +27,30 @@ class QuotaType(str, Enum):
     UNKNOWN = "unknown"
 
 
-class WaitingListEntry(BaseModel):
+class _EntryModel(BaseModel):
+    """
+    Base for parsed PDF entries.
+    
+    Every entry field is required, so a validated instance's fields-set holds
+    all of them. Such instances share one set per class instead of carrying
+    their own (about 700 bytes for seven fields), which roughly halves the
+    memory held by a large parsed list. Instances built by model_construct()
+    with fields left out keep their own set. The shared set must not be
+    modified through model_fields_set.
+    """
+    _all_fields: ClassVar[Set[str]] = set()
+    
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        cls._all_fields = set(cls.model_fields)
+    
+    def model_post_init(self, __context: Any) -> None:
+        if self.model_fields_set == self._all_fields:
+            object.__setattr__(self, "__pydantic_fields_set__", self._all_fields)
+
+
+class WaitingListEntry(_EntryModel):
     """Entry in a waiting list (轮候序号列表)."""
     sequence_number: int = Field(..., description="序号")
     application_code: str = Field(..., description="申请编码")
@@ -31,7 +62,7 @@ class WaitingListEntry(BaseModel):
         }
 
 
-class ScoreRankingEntry(BaseModel):
+class ScoreRankingEntry(_EntryModel):
     """Entry in a score ranking list (积分排序入围名单)."""
     sequence_number: int = Field(..., description="序号")
     application_code: str = Field(..., description="主申请人申请编码")
@@ -78,6 +109,45 @@ class QuotaResult(BaseModel):
     _application_code_index: Optional[Dict[str, int]] = None
     _id_number_index: Optional[Dict[str, int]] = None
     
+    @classmethod
+    def from_trusted_dict(cls, data: Dict[str, Any]) -> "QuotaResult":
+        """
+        Rebuild a quota result from data this server serialized itself.
+        
+        Skips pydantic validation for the result and every entry, only
+        converting datetimes and the quota type back from their JSON form.
+        Applicant names are interned, as the parser does.
+        Use parse_obj for anything that did not come from our own storage.
+        """
+        metadata = dict(data["metadata"])
+        metadata["download_time"] = _as_datetime(metadata["download_time"])
+        metadata["processing_time"] = _as_datetime(metadata.get("processing_time"))
+        metadata["quota_type"] = QuotaType(metadata["quota_type"])
+        
+        return cls.model_construct(
+            metadata=PDFMetadata.model_construct(**metadata),
+            waiting_list_entries=[
+                WaitingListEntry.model_construct(
+                    sequence_number=entry["sequence_number"],
+                    application_code=entry["application_code"],
+                    waiting_time=_as_datetime(entry["waiting_time"]),
+                )
+                for entry in data.get("waiting_list_entries", [])
+            ],
+            score_ranking_entries=[
+                ScoreRankingEntry.model_construct(
+                    sequence_number=entry["sequence_number"],
+                    application_code=entry["application_code"],
+                    applicant_name=sys.intern(entry["applicant_name"]),
+                    id_number=entry["id_number"],
+                    family_generation_count=entry["family_generation_count"],
+                    total_family_score=entry["total_family_score"],
+                    earliest_registration_time=_as_datetime(entry["earliest_registration_time"]),
+                )
+                for entry in data.get("score_ranking_entries", [])
+            ],
+        )
+    
     def build_indexes(self) -> None:
         """Build indexes for fast lookup."""
         self._application_code_index = {}
@@ -7,17 +7,88 @@ Handles two main formats:
 """
 
 import re
+import sys
 import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
 import pdfplumber
+import pypdfium2 as pdfium
 from ..models.quota_result import (
     QuotaResult, QuotaType, WaitingListEntry, ScoreRankingEntry, PDFMetadata
 )
 
 logger = logging.getLogger(__name__)
 
+# Entry patterns use the stdlib re engine. They are anchored and cannot
+# backtrack badly, and matching short lines is dominated by call overhead,
+# which google-re2's bindings add to (about 10x slower per line).
+#
+# Whitespace inside an entry never spans a line break ([^\S\n]), so the same
+# entry body can be matched against single lines or scanned across a page.
+
+# Waiting list entry: sequence number, 13-digit application code and waiting
+# time. Text extraction sometimes drops the space between the code and the
+# time, so it is optional there.
+_WAITING_LIST_ENTRY = (
+    r'(\d+)[^\S\n]+(\d{13})[^\S\n]*(\d{4}-\d{2}-\d{2}[^\S\n]+\d{2}:\d{2}:\d{2}\.\d{3})'
+)
+
+# Score ranking entry; the name pattern is lazy due to variable name lengths
+_SCORE_RANKING_ENTRY = (
+    r'(\d+)[^\S\n]+(\d+)[^\S\n]+([^\d\s]+?)[^\S\n]+(\d{6}\*+\d{4})[^\S\n]+(\d+)[^\S\n]+(\d+)'
+    r'[^\S\n]+(\d{4}-\d{2}-\d{2}[^\S\n]+\d{2}:\d{2}:\d{2}\.\d{3})'
+)
+
+# Patterns matching a single stripped entry line
+WAITING_LIST_PATTERN = re.compile(f'^{_WAITING_LIST_ENTRY}$')
+SCORE_RANKING_PATTERN = re.compile(f'^{_SCORE_RANKING_ENTRY}$')
+
+# Patterns finding every entry line on a page; group 1 is the stripped line
+WAITING_LIST_PAGE_PATTERN = re.compile(
+    rf'^[^\S\n]*({_WAITING_LIST_ENTRY})[^\S\n]*$', re.MULTILINE
+)
+SCORE_RANKING_PAGE_PATTERN = re.compile(
+    rf'^[^\S\n]*({_SCORE_RANKING_ENTRY})[^\S\n]*$', re.MULTILINE
+)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """
+    Parse a matched entry timestamp such as ``2018-01-07 14:56:11.401``.
+    
+    The entry patterns already guarantee the layout, so the fields are sliced
+    at fixed offsets instead of going through strptime. The date is read from
+    the front and the time from the back, which tolerates any run of blanks
+    between them.
+    """
+    return datetime(
+        int(value[0:4]), int(value[5:7]), int(value[8:10]),
+        int(value[-12:-10]), int(value[-9:-7]), int(value[-6:-4]),
+        int(value[-3:]) * 1000
+    )
+
+
+def _canonical_timestamp(value: str) -> str:
+    """
+    Normalize a matched entry timestamp to ``YYYY-MM-DD HH:MM:SS.mmm``.
+    
+    Pydantic parses this form natively, so model fields can take the string
+    directly. Only a wider or non-space gap between date and time is rebuilt.
+    """
+    if len(value) == 23 and value[10] == ' ':
+        return value
+    return f"{value[:10]} {value[-12:]}"
+
+
+# Column headers identifying each PDF format
+SCORE_RANKING_INDICATORS = ("主申请人姓名", "主申请人证件号码", "家庭总积分", "家庭代际数")
+WAITING_LIST_INDICATORS = ("轮候时间", "申请编码")
+
 
 class PDFFormatDetector:
     """Detects the format of Beijing car quota lottery PDF files."""
@@ -33,51 +104,91 @@ class PDFFormatDetector:
         Returns:
             QuotaType indicating the detected format
         """
-        # Check for score ranking indicators
-        score_indicators = [
-            "主申请人姓名", "主申请人证件号码", "家庭总积分", "家庭代际数"
-        ]
-        
-        # Check for waiting list indicators  
-        waiting_indicators = [
-            "轮候时间", "申请编码"
-        ]
-        
-        # Count indicators
-        score_count = sum(1 for indicator in score_indicators if indicator in text_sample)
-        waiting_count = sum(1 for indicator in waiting_indicators if indicator in text_sample)
-        
-        if score_count >= 2:
-            return QuotaType.SCORE_RANKING
-        elif waiting_count >= 1 and "积分" not in text_sample:
+        # Score ranking needs two of its column headers; stop counting there
+        score_count = 0
+        for indicator in SCORE_RANKING_INDICATORS:
+            if indicator in text_sample:
+                score_count += 1
+                if score_count >= 2:
+                    return QuotaType.SCORE_RANKING
+        
+        has_waiting_indicator = any(indicator in text_sample for indicator in WAITING_LIST_INDICATORS)
+        
+        if has_waiting_indicator and "积分" not in text_sample:
             return QuotaType.WAITING_LIST
         else:
             return QuotaType.UNKNOWN
 
 
+# Smallest page count worth splitting across processes; below this, worker
+# start-up and reopening the PDF cost more than extraction saves
+PARALLEL_MIN_PAGES = 50
+
+# Start method for parsing worker pools. Pools are created from threads of a
+# process with a running event loop, where fork() can copy held locks into
+# the child and deadlock it; forkserver and spawn start from a clean process.
+PROCESS_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+# PDFium is not thread-safe, even across separate documents, and PDFs may be
+# parsed from several threads at once (e.g. concurrent refreshes), so all
+# PDFium calls in a process go through this lock
+_PDFIUM_LOCK = threading.Lock()
+
+# Shared parser returned by PDFParser.default()
+_default_parser: Optional["PDFParser"] = None
+
+
+def _extract_page_range(pdf_path: Path, start: int, stop: int, quota_type: QuotaType) -> List[str]:
+    """Extract raw entries from pages [start, stop) of a PDF in a worker process."""
+    parser = PDFParser.default()
+    entries = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            page_text = page.extract_text()
+            if page_text:
+                entries.extend(parser._extract_entries_from_page(page_text, quota_type))
+    return entries
+
+
 class PDFParser:
     """Parser for Beijing car quota lottery PDF files."""
     
-    def __init__(self):
+    def __init__(self, use_pdfium: bool = True):
         self.format_detector = PDFFormatDetector()
         
-        # Regex patterns for different formats
-        self.waiting_list_pattern = re.compile(
-            r'^(\d+)\s+(\d+)\s+(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d{3})$'
-        )
+        # Read page text with PDFium (C++) first; pdfplumber builds per-char
+        # Python objects and is kept as the fallback
+        self.use_pdfium = use_pdfium
         
-        # More flexible pattern for score ranking due to variable name lengths
-        self.score_ranking_pattern = re.compile(
-            r'^(\d+)\s+(\d+)\s+([^\d\s]+?)\s+(\d{6}\*+\d{4})\s+(\d+)\s+(\d+)\s+(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d{3})$'
-        )
+        # Regex patterns for different formats, compiled once per process
+        self.waiting_list_pattern = WAITING_LIST_PATTERN
+        self.score_ranking_pattern = SCORE_RANKING_PATTERN
     
-    def parse_pdf(self, pdf_path: Path, source_url: str = "") -> QuotaResult:
+    @classmethod
+    def default(cls) -> "PDFParser":
+        """
+        Return the process-wide parser with default settings.
+        
+        The parser holds no per-file state, so callers can share one instance
+        instead of constructing their own.
+        """
+        global _default_parser
+        if _default_parser is None:
+            _default_parser = cls()
+        return _default_parser
+    
+    def parse_pdf(self, pdf_path: Path, source_url: str = "", max_workers: int = 1) -> QuotaResult:
         """
         Parse a PDF file and extract quota lottery results.
         
         Args:
             pdf_path: Path to the PDF file
             source_url: URL where the PDF was downloaded from
+            max_workers: Processes to split page extraction across; only used
+                for PDFs with at least PARALLEL_MIN_PAGES pages
             
         Returns:
             QuotaResult containing parsed data
@@ -85,9 +196,12 @@ class PDFParser:
         logger.info(f"Parsing PDF: {pdf_path}")
         
         try:
+            if self.use_pdfium:
+                result = self._parse_pdf_with_pdfium(pdf_path, source_url)
+                if result is not None:
+                    return result
+            
             with pdfplumber.open(pdf_path) as pdf:
-                # Extract metadata
-                file_size = pdf_path.stat().st_size
                 page_count = len(pdf.pages)
                 
                 # Get sample text for format detection
@@ -102,76 +216,169 @@ class PDFParser:
                 logger.info(f"Detected format: {quota_type}")
                 
                 # Extract all text
-                all_entries = []
-                for page_num, page in enumerate(pdf.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        entries = self._extract_entries_from_page(page_text, quota_type)
-                        all_entries.extend(entries)
-                        
-                        if page_num % 50 == 0:  # Log progress every 50 pages
-                            logger.info(f"Processed {page_num + 1}/{page_count} pages")
-                
-                # Create metadata
-                metadata = PDFMetadata(
-                    filename=pdf_path.name,
-                    source_url=source_url,
-                    download_time=datetime.fromtimestamp(pdf_path.stat().st_mtime),
-                    file_size=file_size,
-                    page_count=page_count,
-                    entry_count=len(all_entries),
-                    quota_type=quota_type,
-                    processing_time=datetime.now()
-                )
-                
-                # Create result object
-                result = QuotaResult(metadata=metadata)
-                
-                # Parse entries based on format
-                if quota_type == QuotaType.WAITING_LIST:
-                    result.waiting_list_entries = self._parse_waiting_list_entries(all_entries)
-                elif quota_type == QuotaType.SCORE_RANKING:
-                    result.score_ranking_entries = self._parse_score_ranking_entries(all_entries)
-                
-                # Build indexes for fast lookup
-                result.build_indexes()
-                
-                logger.info(f"Successfully parsed {len(all_entries)} entries from {pdf_path}")
-                return result
+                if max_workers > 1 and page_count >= PARALLEL_MIN_PAGES:
+                    all_entries = self._extract_entries_parallel(
+                        pdf_path, page_count, quota_type, max_workers
+                    )
+                else:
+                    all_entries = self._extract_entries_sequential(pdf, quota_type)
+            
+            return self._build_result(pdf_path, source_url, page_count, quota_type, all_entries)
                 
         except Exception as e:
             logger.error(f"Error parsing PDF {pdf_path}: {e}")
             raise
     
-    def _extract_entries_from_page(self, page_text: str, quota_type: QuotaType) -> List[str]:
-        """Extract data entries from a page of text."""
-        lines = page_text.split('\n')
-        entries = []
+    def _parse_pdf_with_pdfium(self, pdf_path: Path, source_url: str) -> Optional[QuotaResult]:
+        """
+        Parse a PDF using PDFium's text layer.
+        
+        Returns None when PDFium cannot read the file, the format is not
+        recognized or no entries are found, so the caller can retry with
+        pdfplumber's layout-aware extraction.
+        """
+        try:
+            page_texts = self._read_pages_with_pdfium(pdf_path)
+        except Exception as e:
+            logger.warning(f"PDFium could not read {pdf_path}, falling back to pdfplumber: {e}")
+            return None
+        page_count = len(page_texts)
+        
+        # Same sample as the pdfplumber path: up to 3 pages, about 2000 chars
+        sample_text = ""
+        for page_text in page_texts[:3]:
+            sample_text += page_text
+            if len(sample_text) > 2000:
+                break
+        
+        quota_type = self.format_detector.detect_format(sample_text)
+        if quota_type == QuotaType.UNKNOWN:
+            logger.info(f"PDFium text of {pdf_path} has no known format, falling back to pdfplumber")
+            return None
+        logger.info(f"Detected format: {quota_type}")
+        
+        all_entries = []
+        for page_text in page_texts:
+            all_entries.extend(self._extract_entries_from_page(page_text, quota_type))
+        
+        if not all_entries:
+            logger.info(f"PDFium found no entries in {pdf_path}, falling back to pdfplumber")
+            return None
+        
+        return self._build_result(pdf_path, source_url, page_count, quota_type, all_entries)
+    
+    def _read_pages_with_pdfium(self, pdf_path: Path) -> List[str]:
+        """Read the text of every page of a PDF with PDFium, one page at a time."""
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_path)
+            try:
+                page_texts = []
+                for page_index in range(len(pdf)):
+                    page = pdf[page_index]
+                    text_page = page.get_textpage()
+                    page_texts.append(text_page.get_text_range())
+                    text_page.close()
+                    page.close()
+                return page_texts
+            finally:
+                # Also closes a page left open by a failed read
+                pdf.close()
+    
+    def _build_result(
+        self,
+        pdf_path: Path,
+        source_url: str,
+        page_count: int,
+        quota_type: QuotaType,
+        all_entries: List[str]
+    ) -> QuotaResult:
+        """Parse raw entries and wrap them in an indexed QuotaResult."""
+        # Create metadata
+        file_stat = pdf_path.stat()
+        metadata = PDFMetadata(
+            filename=pdf_path.name,
+            source_url=source_url,
+            download_time=datetime.fromtimestamp(file_stat.st_mtime),
+            file_size=file_stat.st_size,
+            page_count=page_count,
+            entry_count=len(all_entries),
+            quota_type=quota_type,
+            processing_time=datetime.now()
+        )
+        
+        # Create result object
+        result = QuotaResult(metadata=metadata)
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        # Parse entries based on format
+        if quota_type == QuotaType.WAITING_LIST:
+            result.waiting_list_entries = self._parse_waiting_list_entries(all_entries)
+        elif quota_type == QuotaType.SCORE_RANKING:
+            result.score_ranking_entries = self._parse_score_ranking_entries(all_entries)
+        
+        # Build indexes for fast lookup
+        result.build_indexes()
+        
+        logger.info(f"Successfully parsed {len(all_entries)} entries from {pdf_path}")
+        return result
+    
+    def _extract_entries_sequential(self, pdf: Any, quota_type: QuotaType) -> List[str]:
+        """Extract raw entries from every page of an open PDF in this process."""
+        page_count = len(pdf.pages)
+        all_entries = []
+        for page_num, page in enumerate(pdf.pages):
+            page_text = page.extract_text()
+            if page_text:
+                entries = self._extract_entries_from_page(page_text, quota_type)
+                all_entries.extend(entries)
                 
-            # Skip headers and non-data lines
-            if any(header in line for header in [
-                "序号", "申请编码", "轮候时间", "主申请人", "积分", "页码", "共", "页"
-            ]):
-                continue
-            
-            # Check if line matches expected data pattern
-            if quota_type == QuotaType.WAITING_LIST:
-                if self.waiting_list_pattern.match(line):
-                    entries.append(line)
-            elif quota_type == QuotaType.SCORE_RANKING:
-                if self.score_ranking_pattern.match(line):
-                    entries.append(line)
-            else:
-                # For unknown format, try both patterns
-                if self.waiting_list_pattern.match(line) or self.score_ranking_pattern.match(line):
-                    entries.append(line)
+                if page_num % 50 == 0:  # Log progress every 50 pages
+                    logger.info(f"Processed {page_num + 1}/{page_count} pages")
         
-        return entries
+        return all_entries
+    
+    def _extract_entries_parallel(
+        self, pdf_path: Path, page_count: int, quota_type: QuotaType, max_workers: int
+    ) -> List[str]:
+        """
+        Extract raw entries with pages split into contiguous ranges, one per
+        worker process.
+        
+        Text extraction is pure Python and dominates parsing, so the pages go
+        to separate processes; each worker opens the PDF once for its range.
+        Ranges are merged back in page order.
+        """
+        workers = min(max_workers, page_count)
+        bounds = [page_count * i // workers for i in range(workers + 1)]
+        logger.info(f"Extracting {page_count} pages across {workers} processes")
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=PROCESS_POOL_CONTEXT) as executor:
+            futures = [
+                executor.submit(_extract_page_range, pdf_path, start, stop, quota_type)
+                for start, stop in zip(bounds, bounds[1:])
+            ]
+            return list(chain.from_iterable(future.result() for future in futures))
+    
+    def _extract_entries_from_page(self, page_text: str, quota_type: QuotaType) -> List[str]:
+        """
+        Extract data entries from a page of text.
+        
+        The page is scanned in one pass per pattern; headers, footers and
+        other non-data lines simply do not match.
+        """
+        if quota_type == QuotaType.WAITING_LIST:
+            return [match.group(1) for match in WAITING_LIST_PAGE_PATTERN.finditer(page_text)]
+        elif quota_type == QuotaType.SCORE_RANKING:
+            return [match.group(1) for match in SCORE_RANKING_PAGE_PATTERN.finditer(page_text)]
+        
+        # For unknown format, try both patterns and keep page order
+        matches = sorted(
+            chain(
+                WAITING_LIST_PAGE_PATTERN.finditer(page_text),
+                SCORE_RANKING_PAGE_PATTERN.finditer(page_text)
+            ),
+            key=lambda match: match.start()
+        )
+        return [match.group(1) for match in matches]
     
     def _parse_waiting_list_entries(self, raw_entries: List[str]) -> List[WaitingListEntry]:
         """Parse waiting list entries."""
@@ -183,7 +390,7 @@ class PDFParser:
                 try:
                     sequence_number = int(match.group(1))
                     application_code = match.group(2)
-                    waiting_time = datetime.strptime(match.group(3), "%Y-%m-%d %H:%M:%S.%f")
+                    waiting_time = _parse_timestamp(match.group(3))
                     
                     entry = WaitingListEntry(
                         sequence_number=sequence_number,
@@ -205,22 +412,21 @@ class PDFParser:
             match = self.score_ranking_pattern.match(raw_entry)
             if match:
                 try:
-                    sequence_number = int(match.group(1))
-                    application_code = match.group(2)
-                    applicant_name = match.group(3).strip()
-                    id_number = match.group(4)
-                    family_generation_count = int(match.group(5))
-                    total_family_score = int(match.group(6))
-                    earliest_registration_time = datetime.strptime(match.group(7), "%Y-%m-%d %H:%M:%S.%f")
+                    # Fields go to the model as matched strings; pydantic's
+                    # core converts the integers and timestamp in one pass.
+                    # Common names repeat across a ranking, so share one copy.
+                    (sequence_number, application_code, applicant_name, id_number,
+                     family_generation_count, total_family_score,
+                     earliest_registration_time) = match.groups()
                     
                     entry = ScoreRankingEntry(
                         sequence_number=sequence_number,
                         application_code=application_code,
-                        applicant_name=applicant_name,
+                        applicant_name=sys.intern(applicant_name),
                         id_number=id_number,
                         family_generation_count=family_generation_count,
                         total_family_score=total_family_score,
-                        earliest_registration_time=earliest_registration_time
+                        earliest_registration_time=_canonical_timestamp(earliest_registration_time)
                     )
                     entries.append(entry)
                     
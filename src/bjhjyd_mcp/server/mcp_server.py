@@ -5,20 +5,27 @@ Uses fastapi_mcp to expose FastAPI endpoints as MCP tools for AI agents.
 """
 
 import asyncio
+import heapq
 import logging
+import os
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from fastapi import FastAPI, HTTPException, Query
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from fastapi_mcp import FastApiMCP
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 import uvicorn
 import aiofiles
+import ahocorasick
 import re
 import json
 
 from ..models.quota_result import QuotaResult, QuotaType
-from ..parsers.pdf_parser import PDFParser
+from ..parsers.pdf_parser import PDFParser, PROCESS_POOL_CONTEXT
 from ..scrapers.web_scraper import WebScraper
 from ..scrapers.policy_scraper import PolicyScraper
 from ..storage.data_store import DataStore
@@ -27,20 +34,139 @@ from ..utils.celebration_generator import CelebrationGenerator
 
 logger = logging.getLogger(__name__)
 
+# Environment variables used to hand configuration to uvicorn worker processes
+DATA_DIR_ENV = "BJHJYD_DATA_DIR"
+DOWNLOADS_DIR_ENV = "BJHJYD_DOWNLOADS_DIR"
+WORKERS_ENV = "BJHJYD_WORKERS"
+
+# Waiting list entries up to this sequence number are treated as likely winners
+PRIORITY_SEQUENCE_LIMIT = 50000
+WAITING_LIST_TYPE = QuotaType.WAITING_LIST.value
+
+# Common policy-related keywords looked for in policy questions
+POLICY_KEYWORDS = frozenset({
+    # Application types
+    "个人申请", "家庭申请", "单位申请", "个人", "家庭", "单位", "企业",
+    
+    # Vehicle types
+    "新能源", "普通", "燃油车", "电动车", "纯电动",
+    
+    # Process terms
+    "申请", "摇号", "轮候", "更新", "复核", "审核", "流程", "程序",
+    
+    # Requirements
+    "资格", "条件", "要求", "证件", "证明", "驾驶证", "身份证", "居住证", "工作居住证",
+    
+    # Time-related
+    "时间", "期限", "有效期", "申报期", "截止", "多久", "什么时候", "几月",
+    
+    # Results and status
+    "结果", "中签", "获得", "成功", "失败", "等待", "排队",
+    
+    # Documents and procedures
+    "材料", "文件", "手续", "窗口", "办理", "提交", "打印", "下载",
+    
+    # Specific processes
+    "转让", "变更", "过户", "注销", "登记", "被盗", "抢夺"
+})
+
+# Question words that are also treated as keywords
+QUESTION_WORDS = frozenset({"如何", "怎么", "什么", "哪些", "多少", "几", "是否", "能否", "可以", "需要"})
+
+# Terms that add to a document's relevance when the question mentions the main term
+RELATED_TERMS = {
+    "申请": ("提交", "填报", "办理", "登记"),
+    "材料": ("证件", "文件", "证明", "资料"),
+    "条件": ("要求", "资格", "规定"),
+    "流程": ("程序", "步骤", "操作", "办理"),
+    "时间": ("期限", "截止", "有效期", "申报期")
+}
+
+# Blank-line boundary between paragraphs of a policy document
+PARAGRAPH_BREAK_PATTERN = re.compile(r'\n{2,}')
+
+# Patterns used to clean up policy sections for presentation
+MARKDOWN_FORMAT_PATTERN = re.compile(r'[#*_]')
+URL_PATTERN = re.compile(r'http[s]?://\S+')
+MARKDOWN_LINK_PATTERN = re.compile(r'\[([^\]]*)\]\([^\)]*\)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+SYSTEM_NOTE_PATTERN = re.compile(r'\*[^*]*系统.*?\*')
+
+# Numbered or ordinal step indicators in policy sections, fused into one
+# alternation so each section is scanned once
+STEP_PATTERN = re.compile(
+    r'\d+\.?\s*(?P<numbered>[^。]*(?:申请|提交|办理|填报)[^。]*)'
+    r'|第\s*[一二三四五六七八九十]+\s*[步条]?\s*[：:]?\s*(?P<ordinal>[^。]*)'
+)
+
+# Important note and warning indicators in policy sections; longer markers
+# come first so "注意"/"备注" are not consumed by the bare "注"
+NOTE_PATTERN = re.compile(r'(?:特别提醒|注意|重要|备注|注)[：:]?\s*(?P<note>[^。]*)')
+
+# Answer headers by question intent, checked in order; the first intent with
+# a word present in the question wins
+ANSWER_HEADERS = (
+    (("如何", "怎么", "怎样"), "根据政策规定，具体步骤如下：\n"),
+    (("什么", "哪些"), "根据政策文件，相关信息如下：\n"),
+    (("需要", "要", "应该"), "根据政策要求：\n"),
+)
+DEFAULT_ANSWER_HEADER = "根据相关政策规定：\n"
+
+# Topic tags suggested for policy documents whose filename contains the token
+FILENAME_TOPIC_TAGS = {
+    "个人申请": "个人申请相关政策",
+    "家庭申请": "家庭申请相关政策",
+    "材料": "申请材料清单",
+    "更新": "更新指标政策",
+}
+
+# Number of most relevant policy documents used to answer a question
+POLICY_TOP_DOCUMENTS = 5
+
+# Maximum number of policy explanations kept in the answer cache
+POLICY_ANSWER_CACHE_SIZE = 1024
+
+# Static part of the celebration suggestion attached to winning search results
+CELEBRATION_SUGGESTION = {
+    "message": "🎉 Congratulations! You appear to have won the lottery!",
+    "action": "Generate a celebration page to share the good news!",
+    "endpoint": "/celebration/generate",
+}
+
 
 class QuotaSearchRequest(BaseModel):
     """Request model for quota searches."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     application_code: str = Field(..., description="申请编码")
 
 
 class IDSearchRequest(BaseModel):
     """Request model for ID number searches."""
-    id_prefix: Optional[str] = Field(None, description="身份证号前6位 (可选)")
-    id_suffix: Optional[str] = Field(None, description="身份证号后4位 (可选)")
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
+    id_prefix: Optional[str] = Field(
+        None, min_length=6, max_length=6, pattern=r"^[0-9]{6}$",
+        description="身份证号前6位 (可选)"
+    )
+    id_suffix: Optional[str] = Field(
+        None, min_length=4, max_length=4, pattern=r"^[0-9]{3}[0-9X]$",
+        description="身份证号后4位 (可选)"
+    )
+    
+    @field_validator("id_prefix", "id_suffix", mode="before")
+    @classmethod
+    def normalize_id_part(cls, value: Any) -> Any:
+        """Treat an empty string as not provided and uppercase the X check digit."""
+        if isinstance(value, str):
+            return value.upper() or None
+        return value
 
 
 class CelebrationRequest(BaseModel):
     """Request model for celebration page generation."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     application_code: str = Field(..., description="申请编码")
     name: Optional[str] = Field("恭喜您", description="获奖者姓名 (可选)")
     save_to_file: Optional[bool] = Field(False, description="是否保存为文件 (可选)")
@@ -48,6 +174,8 @@ class CelebrationRequest(BaseModel):
 
 class PolicyExplanationRequest(BaseModel):
     """Request model for policy explanations."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     question: str = Field(..., description="关于小客车指标政策的问题")
     detail_level: Optional[str] = Field("medium", description="详细程度: basic, medium, detailed")
     category: Optional[str] = Field(None, description="政策类别: 个人申请, 家庭申请, 单位申请, 新能源, 更新指标, 申请材料, 等等")
@@ -61,7 +189,8 @@ class MCPServer:
         data_dir: Path = Path("data"),
         downloads_dir: Path = Path("downloads"),
         host: str = "127.0.0.1",
-        port: int = 8000
+        port: int = 8000,
+        workers: int = 1
     ):
         """
         Initialize the MCP server.
@@ -71,29 +200,53 @@ class MCPServer:
             downloads_dir: Directory for downloaded PDF files
             host: Server host
             port: Server port
+            workers: Number of uvicorn worker processes
         """
         self.data_dir = data_dir
         self.downloads_dir = downloads_dir
         self.host = host
         self.port = port
+        self.workers = workers
+        
+        # Processes each refresh splits PDF page extraction across; every
+        # worker may refresh at once, so they share the cores between them
+        self.parse_processes = max(1, (os.cpu_count() or 1) // workers)
         
         # Initialize components
         self.data_store = DataStore(data_dir)
-        self.pdf_parser = PDFParser()
+        self.pdf_parser = PDFParser.default()
         self.web_scraper = WebScraper(downloads_dir)
         self.policy_scraper = PolicyScraper()
         self.analyzer = LotteryAnalyzer(self.data_store)
         self.celebration_generator = CelebrationGenerator()
         
+        # Keyword matcher for policy questions
+        self._policy_automaton = self._build_policy_automaton()
+        
+        # Policy document listing, rescanned only when the directory changes
+        self._policy_files: List[Path] = []
+        self._policy_dir_mtime: Optional[int] = None
+        
+        # Loaded policy documents (content, lowercased content and term
+        # counts), keyed by path and refreshed when the file mtime changes
+        self._policy_documents: Dict[Path, Dict[str, Any]] = {}
+        
+        # LRU cache of policy explanations keyed by (question, category,
+        # detail_level), each stored with the policy file mtimes it was
+        # answered from so an edited document invalidates it
+        self._policy_answers: "OrderedDict[Tuple[str, Optional[str], str], Tuple[Tuple[Tuple[Path, int], ...], Dict[str, Any]]]" = OrderedDict()
+        
         # Create FastAPI app
         self.app = FastAPI(
             title="Beijing Car Quota Lottery MCP Server",
             description="MCP server for querying Beijing car quota lottery results",
-            version="0.1.0"
+            version="0.1.0",
+            lifespan=self._lifespan
         )
         
-        # Setup routes
+        # Setup routes and error handling
         self._setup_routes()
+        self._setup_exception_handlers()
         
         # Create MCP server
         self.mcp = FastApiMCP(
@@ -105,6 +258,20 @@ class MCPServer:
         # Mount MCP server
         self.mcp.mount()
     
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        """Application lifespan: persist pending data store changes on shutdown."""
+        yield
+        await self.data_store.flush()
+    
+    def _setup_exception_handlers(self):
+        """Report unexpected endpoint failures as 500 responses in one place."""
+        
+        @self.app.exception_handler(Exception)
+        async def handle_unexpected_error(request: Request, exc: Exception):
+            logger.error(f"Error handling {request.method} {request.url.path}: {exc}")
+            return JSONResponse(status_code=500, content={"detail": str(exc)})
+    
     def _setup_routes(self):
         """Setup FastAPI routes that will be exposed as MCP tools."""
         
@@ -127,54 +294,43 @@ class MCPServer:
             This tool searches across all loaded PDF files to find entries
             matching the provided application code.
             """
-            try:
-                results = await self.data_store.find_by_application_code(request.application_code)
-                
-                if not results:
-                    return {
-                        "found": False,
-                        "message": f"No results found for application code: {request.application_code}",
-                        "application_code": request.application_code
-                    }
-                
-                # Check if this might be a winner (not just waiting list)
-                winner_results = [r for r in results if r.get("type") != "waiting_list"]
-                is_potential_winner = len(winner_results) > 0
-                
-                # Also check for high-priority waiting list (early sequence numbers)
-                if not is_potential_winner:
-                    high_priority_results = [r for r in results if r.get("sequence_number") and r.get("sequence_number") <= 50000]
-                    is_potential_winner = len(high_priority_results) > 0
-                
-                response = {
-                    "found": True,
-                    "application_code": request.application_code,
-                    "results": results,
-                    "count": len(results)
+            results = await self.data_store.find_by_application_code(request.application_code)
+            
+            if not results:
+                return {
+                    "found": False,
+                    "message": f"No results found for application code: {request.application_code}",
+                    "application_code": request.application_code
                 }
-                
-                # Add celebration suggestion for potential winners
-                if is_potential_winner:
-                    response["winner_detected"] = True
-                    response["celebration_suggestion"] = {
-                        "message": "🎉 Congratulations! You appear to have won the lottery!",
-                        "action": "Generate a celebration page to share the good news!",
-                        "endpoint": "/celebration/generate",
-                        "parameters": {
-                            "application_code": request.application_code,
-                            "name": "您的姓名",  # User can customize
-                            "save_to_file": True
-                        }
+            
+            # Check if this might be a winner (not just waiting list), or is
+            # high up a waiting list (early sequence numbers)
+            winner_results, high_priority_results = self._split_winner_results(results)
+            is_potential_winner = len(winner_results) > 0 or len(high_priority_results) > 0
+            
+            response = {
+                "found": True,
+                "application_code": request.application_code,
+                "results": results,
+                "count": len(results)
+            }
+            
+            # Add celebration suggestion for potential winners
+            if is_potential_winner:
+                response["winner_detected"] = True
+                response["celebration_suggestion"] = {
+                    **CELEBRATION_SUGGESTION,
+                    "parameters": {
+                        "application_code": request.application_code,
+                        "name": "您的姓名",  # User can customize
+                        "save_to_file": True
                     }
-                else:
-                    response["winner_detected"] = False
-                    response["status_info"] = "Currently on waiting list - keep checking for updates!"
-                
-                return response
-                
-            except Exception as e:
-                logger.error(f"Error searching by application code {request.application_code}: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+                }
+            else:
+                response["winner_detected"] = False
+                response["status_info"] = "Currently on waiting list - keep checking for updates!"
+            
+            return response
         
         @self.app.post("/search/id-number", operation_id="search_by_id_number")
         async def search_by_id_number(request: IDSearchRequest):
@@ -187,94 +343,71 @@ class MCPServer:
             - Only id_suffix (last 4 digits) 
             - Both id_prefix and id_suffix for exact match
             """
-            try:
-                # Validation: at least one field must be provided
-                if not request.id_prefix and not request.id_suffix:
-                    raise HTTPException(
-                        status_code=400, 
-                        detail="At least one of id_prefix or id_suffix must be provided"
-                    )
-                
-                # Validate field formats if provided
-                if request.id_prefix and len(request.id_prefix) != 6:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="id_prefix must be exactly 6 digits"
-                    )
-                
-                if request.id_suffix and len(request.id_suffix) != 4:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="id_suffix must be exactly 4 digits"
-                    )
-                
-                # Search using the new flexible method
-                results = await self.data_store.find_by_id_prefix_or_suffix(
-                    request.id_prefix, request.id_suffix
+            # Validation: at least one field must be provided
+            if not request.id_prefix and not request.id_suffix:
+                raise HTTPException(
+                    status_code=400, 
+                    detail="At least one of id_prefix or id_suffix must be provided"
                 )
-                
-                # Create search pattern description
-                if request.id_prefix and request.id_suffix:
-                    search_pattern = f"{request.id_prefix}****{request.id_suffix}"
-                elif request.id_prefix:
-                    search_pattern = f"{request.id_prefix}****XXXX"
-                else:
-                    search_pattern = f"XXXXXX****{request.id_suffix}"
-                
-                if not results:
-                    return {
-                        "found": False,
-                        "message": f"No results found for ID pattern: {search_pattern}",
-                        "search_pattern": search_pattern,
-                        "search_type": "prefix_and_suffix" if (request.id_prefix and request.id_suffix) 
-                                      else "prefix_only" if request.id_prefix 
-                                      else "suffix_only"
-                    }
-                
-                # Check if any results indicate winners
-                winner_results = [r for r in results if r.get("type") != "waiting_list"]
-                high_priority_results = [r for r in results if r.get("sequence_number") and r.get("sequence_number") <= 50000]
-                is_potential_winner = len(winner_results) > 0 or len(high_priority_results) > 0
-                
-                response = {
-                    "found": True,
+            
+            # Search using the new flexible method
+            results = await self.data_store.find_by_id_prefix_or_suffix(
+                request.id_prefix, request.id_suffix
+            )
+            
+            # Create search pattern description
+            if request.id_prefix and request.id_suffix:
+                search_pattern = f"{request.id_prefix}****{request.id_suffix}"
+            elif request.id_prefix:
+                search_pattern = f"{request.id_prefix}****XXXX"
+            else:
+                search_pattern = f"XXXXXX****{request.id_suffix}"
+            
+            if not results:
+                return {
+                    "found": False,
+                    "message": f"No results found for ID pattern: {search_pattern}",
                     "search_pattern": search_pattern,
                     "search_type": "prefix_and_suffix" if (request.id_prefix and request.id_suffix) 
                                   else "prefix_only" if request.id_prefix 
-                                  else "suffix_only",
-                    "results": results,
-                    "count": len(results)
+                                  else "suffix_only"
                 }
-                
-                # Add celebration suggestion for potential winners
-                if is_potential_winner and len(results) == 1:  # Only suggest for single match
-                    result = results[0]
-                    response["winner_detected"] = True
-                    response["celebration_suggestion"] = {
-                        "message": "🎉 Congratulations! You appear to have won the lottery!",
-                        "action": "Generate a celebration page to share the good news!",
-                        "endpoint": "/celebration/generate",
-                        "parameters": {
-                            "application_code": result.get("application_code", ""),
-                            "name": result.get("name", "您的姓名"),
-                            "save_to_file": True
-                        }
+            
+            # Check if any results indicate winners
+            winner_results, high_priority_results = self._split_winner_results(results)
+            is_potential_winner = len(winner_results) > 0 or len(high_priority_results) > 0
+            
+            response = {
+                "found": True,
+                "search_pattern": search_pattern,
+                "search_type": "prefix_and_suffix" if (request.id_prefix and request.id_suffix) 
+                              else "prefix_only" if request.id_prefix 
+                              else "suffix_only",
+                "results": results,
+                "count": len(results)
+            }
+            
+            # Add celebration suggestion for potential winners
+            if is_potential_winner and len(results) == 1:  # Only suggest for single match
+                result = results[0]
+                response["winner_detected"] = True
+                response["celebration_suggestion"] = {
+                    **CELEBRATION_SUGGESTION,
+                    "parameters": {
+                        "application_code": result.get("application_code", ""),
+                        "name": result.get("name", "您的姓名"),
+                        "save_to_file": True
                     }
-                elif is_potential_winner:
-                    response["winner_detected"] = True
-                    response["multiple_winners"] = True
-                    response["celebration_note"] = "Multiple winning entries found! You can generate celebration pages for each application code."
-                else:
-                    response["winner_detected"] = False
-                    response["status_info"] = "Currently on waiting list - keep checking for updates!"
-                
-                return response
-                
-            except HTTPException:
-                raise
-            except Exception as e:
-                logger.error(f"Error searching by ID {request.id_prefix}/{request.id_suffix}: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+                }
+            elif is_potential_winner:
+                response["winner_detected"] = True
+                response["multiple_winners"] = True
+                response["celebration_note"] = "Multiple winning entries found! You can generate celebration pages for each application code."
+            else:
+                response["winner_detected"] = False
+                response["status_info"] = "Currently on waiting list - keep checking for updates!"
+            
+            return response
         
         @self.app.post("/celebration/generate", operation_id="generate_celebration_page")
         async def generate_celebration_page(request: CelebrationRequest):
@@ -285,80 +418,74 @@ class MCPServer:
             to celebrate users who have won the car quota lottery. The page includes
             fireworks, confetti, sparkles, and sharing functionality.
             """
-            try:
-                # First, verify that the application code actually won
-                results = await self.data_store.find_by_application_code(request.application_code)
-                
-                if not results:
+            # First, verify that the application code actually won
+            results = await self.data_store.find_by_application_code(request.application_code)
+            
+            if not results:
+                return {
+                    "success": False,
+                    "message": f"No lottery results found for application code: {request.application_code}",
+                    "celebration_generated": False
+                }
+            
+            # Check if the person actually won (not just in waiting list), or
+            # is in a prioritized waiting list (which might indicate winning)
+            winner_results, prioritized_results = self._split_winner_results(results)
+            
+            if not winner_results:
+                if not prioritized_results:
                     return {
                         "success": False,
-                        "message": f"No lottery results found for application code: {request.application_code}",
-                        "celebration_generated": False
+                        "message": "Application code found but appears to be on waiting list only. Celebration pages are for confirmed winners.",
+                        "celebration_generated": False,
+                        "waiting_list_info": results[:3]  # Show first 3 waiting list entries
                     }
-                
-                # Check if the person actually won (not just in waiting list)
-                winner_results = [r for r in results if r.get("type") != "waiting_list"]
-                
-                if not winner_results:
-                    # Check if they're in a prioritized waiting list (which might indicate winning)
-                    prioritized_results = [r for r in results if r.get("sequence_number") and r.get("sequence_number") <= 50000]
-                    
-                    if not prioritized_results:
-                        return {
-                            "success": False,
-                            "message": "Application code found but appears to be on waiting list only. Celebration pages are for confirmed winners.",
-                            "celebration_generated": False,
-                            "waiting_list_info": results[:3]  # Show first 3 waiting list entries
-                        }
-                    else:
-                        # Use prioritized waiting list results as potential winners
-                        winner_results = prioritized_results
-                
-                # Prepare winner information
-                winner_info = {
-                    "application_code": request.application_code,
-                    "name": request.name or "恭喜您",
-                    "id_info": ""  # We don't have ID info from application code search
-                }
-                
-                # Generate celebration page
-                save_path = None
-                if request.save_to_file:
-                    celebrations_dir = self.data_dir / "celebrations"
-                    celebrations_dir.mkdir(exist_ok=True)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    save_path = celebrations_dir / f"celebration_{request.application_code}_{timestamp}.html"
-                
-                html_content = self.celebration_generator.generate_celebration_page(
-                    winner_info=winner_info,
-                    lottery_results=winner_results,
-                    save_path=save_path
-                )
-                
-                # Create sharing links
-                sharing_links = self.celebration_generator.create_sharing_links(winner_info)
-                
-                response = {
-                    "success": True,
-                    "message": "🎉 Celebration page generated successfully!",
-                    "celebration_generated": True,
-                    "application_code": request.application_code,
-                    "winner_name": winner_info["name"],
-                    "lottery_results_count": len(winner_results),
-                    "sharing_links": sharing_links
-                }
-                
-                if request.save_to_file and save_path:
-                    response["saved_file"] = str(save_path)
                 else:
-                    # Return HTML content directly if not saving to file
-                    response["html_content"] = html_content
-                
-                return response
-                
-            except Exception as e:
-                logger.error(f"Error generating celebration page for {request.application_code}: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+                    # Use prioritized waiting list results as potential winners
+                    winner_results = prioritized_results
+            
+            # Prepare winner information
+            winner_info = {
+                "application_code": request.application_code,
+                "name": request.name or "恭喜您",
+                "id_info": ""  # We don't have ID info from application code search
+            }
+            
+            # Generate celebration page; the generator creates the directory
+            save_path = None
+            if request.save_to_file:
+                celebrations_dir = self.data_dir / "celebrations"
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                save_path = celebrations_dir / f"celebration_{request.application_code}_{timestamp}.html"
+            
+            # Rendering and writing the page block, so run them off the event loop
+            html_content = await asyncio.to_thread(
+                self.celebration_generator.generate_celebration_page,
+                winner_info=winner_info,
+                lottery_results=winner_results,
+                save_path=save_path
+            )
+            
+            # Create sharing links
+            sharing_links = self.celebration_generator.create_sharing_links(winner_info)
+            
+            response = {
+                "success": True,
+                "message": "🎉 Celebration page generated successfully!",
+                "celebration_generated": True,
+                "application_code": request.application_code,
+                "winner_name": winner_info["name"],
+                "lottery_results_count": len(winner_results),
+                "sharing_links": sharing_links
+            }
+            
+            if request.save_to_file and save_path:
+                response["saved_file"] = str(save_path)
+            else:
+                # Return HTML content directly if not saving to file
+                response["html_content"] = html_content
+            
+            return response
         
         @self.app.get("/data/statistics", operation_id="get_data_statistics")
         async def get_data_statistics():
@@ -368,12 +495,8 @@ class MCPServer:
             Returns information about the number of files loaded, total entries,
             last update time, and breakdown by data type.
             """
-            try:
-                stats = await self.data_store.get_statistics()
-                return stats
-            except Exception as e:
-                logger.error(f"Error getting statistics: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+            stats = await self.data_store.get_statistics()
+            return stats
         
         @self.app.post("/data/refresh", operation_id="refresh_data")
         async def refresh_data(max_pages: int = Query(5, description="Maximum pages to scrape")):
@@ -383,60 +506,63 @@ class MCPServer:
             This tool scrapes the Beijing Transportation Commission website
             for new PDF files and processes them to update the searchable data.
             """
-            try:
-                logger.info("Starting data refresh...")
-                
-                # Use WebScraper as context manager to ensure proper resource cleanup
-                async with WebScraper(self.downloads_dir) as scraper:
-                    # Scrape and download new PDFs
-                    downloaded_files = await scraper.scrape_and_download(max_pages)
-                
-                if not downloaded_files:
-                    return {
-                        "success": True,
-                        "message": "No new PDF files found",
-                        "files_processed": 0
-                    }
-                
-                # Process downloaded PDFs
-                processed_count = 0
-                errors = []
-                
-                for file_info in downloaded_files:
-                    try:
-                        pdf_path = self.downloads_dir / file_info["filename"]
-                        source_url = file_info.get("source_page", "")
-                        
-                        # Parse PDF
-                        result = self.pdf_parser.parse_pdf(pdf_path, source_url)
-                        
-                        # Validate parsed data
-                        validation_report = self.pdf_parser.validate_parsed_data(result)
-                        
-                        if validation_report["is_valid"]:
-                            # Add to data store
-                            await self.data_store.add_quota_result(result)
-                            processed_count += 1
-                            logger.info(f"Successfully processed {file_info['filename']}")
-                        else:
-                            errors.append(f"Validation failed for {file_info['filename']}: {validation_report['errors']}")
-                            
-                    except Exception as e:
-                        error_msg = f"Error processing {file_info['filename']}: {str(e)}"
-                        errors.append(error_msg)
-                        logger.error(error_msg)
-                
+            logger.info("Starting data refresh...")
+            
+            # Use WebScraper as context manager to ensure proper resource cleanup
+            async with WebScraper(self.downloads_dir) as scraper:
+                # Scrape and download new PDFs
+                downloaded_files = await scraper.scrape_and_download(max_pages)
+            
+            if not downloaded_files:
                 return {
                     "success": True,
-                    "message": f"Data refresh completed",
-                    "files_downloaded": len(downloaded_files),
-                    "files_processed": processed_count,
-                    "errors": errors
+                    "message": "No new PDF files found",
+                    "files_processed": 0
                 }
-                
-            except Exception as e:
-                logger.error(f"Error during data refresh: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+            
+            # Process downloaded PDFs
+            processed_count = 0
+            errors = []
+            
+            for file_info in downloaded_files:
+                try:
+                    pdf_path = self.downloads_dir / file_info["filename"]
+                    source_url = file_info.get("source_page", "")
+                    
+                    # Parse PDF off the event loop, splitting a large file's
+                    # pages across processes
+                    result = await asyncio.to_thread(
+                        self.pdf_parser.parse_pdf, pdf_path, source_url, self.parse_processes
+                    )
+                    
+                    # Validate parsed data
+                    validation_report = self.pdf_parser.validate_parsed_data(result)
+                    
+                    if validation_report["is_valid"]:
+                        # Add to data store
+                        await self.data_store.add_quota_result(result)
+                        processed_count += 1
+                        logger.info(f"Successfully processed {file_info['filename']}")
+                    else:
+                        errors.append(f"Validation failed for {file_info['filename']}: {validation_report['errors']}")
+                        
+                except Exception as e:
+                    error_msg = f"Error processing {file_info['filename']}: {str(e)}"
+                    errors.append(error_msg)
+                    logger.error(error_msg)
+            
+            # Save now rather than after the flush delay, so other worker
+            # processes see the new results as soon as this returns
+            if processed_count:
+                await self.data_store.flush()
+            
+            return {
+                "success": True,
+                "message": f"Data refresh completed",
+                "files_downloaded": len(downloaded_files),
+                "files_processed": processed_count,
+                "errors": errors
+            }
         
         @self.app.post("/data/scrape-policy", operation_id="scrape_policy_documents")
         async def scrape_policy_documents():
@@ -446,22 +572,20 @@ class MCPServer:
             This tool scrapes policy documents from the Beijing Transportation Commission website
             and processes them to update the searchable data.
             """
-            try:
-                logger.info("Starting policy document scraping...")
-                
-                # Scrape policy documents
-                scraped_documents = await self.policy_scraper.scrape_policy_content()
-                
-                return {
-                    "success": True,
-                    "message": f"Policy document scraping completed",
-                    "total_documents": len(scraped_documents),
-                    "documents": scraped_documents
-                }
-                
-            except Exception as e:
-                logger.error(f"Error during policy scraping: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+            logger.info("Starting policy document scraping...")
+            
+            # Scrape policy documents
+            scraped_documents = await self.policy_scraper.scrape_policy_content()
+            
+            # Scraping may rewrite existing documents in place
+            self._policy_answers.clear()
+            
+            return {
+                "success": True,
+                "message": f"Policy document scraping completed",
+                "total_documents": len(scraped_documents),
+                "documents": scraped_documents
+            }
         
         @self.app.post("/policy/explain", operation_id="explain_car_quota_policy")
         async def explain_car_quota_policy(request: PolicyExplanationRequest):
@@ -473,46 +597,55 @@ class MCPServer:
             questions about application procedures, requirements, materials needed, 
             timeframes, and specific policy details.
             """
-            try:
-                logger.info(f"Processing policy question: {request.question}")
-                
-                # Search relevant policy documents
-                relevant_docs = await self._find_relevant_policy_documents(request.question, request.category)
-                
-                if not relevant_docs:
-                    return {
-                        "question": request.question,
-                        "answer": "很抱歉，在现有的政策知识库中没有找到相关信息。建议您访问北京市交通委员会官方网站或致电12328咨询热线获取最新政策信息。",
-                        "confidence": "low",
-                        "sources": [],
-                        "suggestions": [
-                            "请检查问题的关键词是否正确",
-                            "尝试使用更具体的政策术语",
-                            "访问官方网站: https://xkczb.jtw.beijing.gov.cn",
-                            "致电咨询热线: 12328"
-                        ]
-                    }
-                
-                # Generate explanation based on relevant documents
-                explanation = await self._generate_policy_explanation(
-                    request.question, 
-                    relevant_docs, 
-                    request.detail_level
-                )
-                
+            logger.info(f"Processing policy question: {request.question}")
+            
+            cache_key = (request.question, request.category, request.detail_level)
+            documents_signature = self._get_policy_documents_signature()
+            cached_answer = self._get_cached_policy_answer(cache_key, documents_signature)
+            if cached_answer is not None:
+                return cached_answer
+            
+            # Search relevant policy documents
+            relevant_docs, documents_complete = await self._find_relevant_policy_documents(
+                request.question, request.category
+            )
+            
+            if not relevant_docs:
                 return {
                     "question": request.question,
-                    "answer": explanation["answer"],
-                    "confidence": explanation["confidence"],
-                    "sources": explanation["sources"],
-                    "related_topics": explanation["related_topics"],
-                    "actionable_steps": explanation.get("actionable_steps", []),
-                    "important_notes": explanation.get("important_notes", [])
+                    "answer": "很抱歉，在现有的政策知识库中没有找到相关信息。建议您访问北京市交通委员会官方网站或致电12328咨询热线获取最新政策信息。",
+                    "confidence": "low",
+                    "sources": [],
+                    "suggestions": [
+                        "请检查问题的关键词是否正确",
+                        "尝试使用更具体的政策术语",
+                        "访问官方网站: https://xkczb.jtw.beijing.gov.cn",
+                        "致电咨询热线: 12328"
+                    ]
                 }
-                
-            except Exception as e:
-                logger.error(f"Error explaining policy: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+            
+            # Generate explanation based on relevant documents
+            explanation, explanation_complete = await self._generate_policy_explanation(
+                request.question, 
+                relevant_docs, 
+                request.detail_level
+            )
+            
+            answer = {
+                "question": request.question,
+                "answer": explanation["answer"],
+                "confidence": explanation["confidence"],
+                "sources": explanation["sources"],
+                "related_topics": explanation["related_topics"],
+                "actionable_steps": explanation.get("actionable_steps", []),
+                "important_notes": explanation.get("important_notes", [])
+            }
+            # An answer built despite an error is not cached, so the next
+            # request tries again
+            if documents_complete and explanation_complete:
+                self._cache_policy_answer(cache_key, documents_signature, answer)
+            
+            return answer
         
         @self.app.get("/data/files", operation_id="list_data_files")
         async def list_data_files():
@@ -522,15 +655,11 @@ class MCPServer:
             Returns information about each PDF file that has been processed
             and is available for searching.
             """
-            try:
-                stats = await self.data_store.get_statistics()
-                return {
-                    "total_files": stats["total_files"],
-                    "files": stats["files"]
-                }
-            except Exception as e:
-                logger.error(f"Error listing files: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+            stats = await self.data_store.get_statistics()
+            return {
+                "total_files": stats["total_files"],
+                "files": stats["files"]
+            }
 
         # Analysis endpoints
         @self.app.get("/analysis/comprehensive", operation_id="get_comprehensive_analysis")
@@ -542,12 +671,8 @@ class MCPServer:
             including success rates by year, estimated waiting times, trend analysis,
             and personalized recommendations.
             """
-            try:
-                analysis = await self.analyzer.get_comprehensive_analysis()
-                return analysis
-            except Exception as e:
-                logger.error(f"Error getting comprehensive analysis: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+            analysis = await self.analyzer.get_comprehensive_analysis()
+            return analysis
 
         @self.app.get("/analysis/success-rates", operation_id="get_success_rates_analysis")
         async def get_success_rates_analysis():
@@ -557,12 +682,8 @@ class MCPServer:
             This tool calculates and returns the success rates for each year,
             including estimated number of applicants, winners, and rejection rates.
             """
-            try:
-                analysis = await self.analyzer.get_success_rates()
-                return analysis
-            except Exception as e:
-                logger.error(f"Error getting success rates analysis: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+            analysis = await self.analyzer.get_success_rates()
+            return analysis
 
         @self.app.get("/analysis/waiting-time", operation_id="get_waiting_time_analysis")
         async def get_waiting_time_analysis():
@@ -572,12 +693,8 @@ class MCPServer:
             This tool estimates average waiting times for people in the queue
             based on historical data and annual quotas.
             """
-            try:
-                analysis = await self.analyzer.get_waiting_time_analysis()
-                return analysis
-            except Exception as e:
-                logger.error(f"Error getting waiting time analysis: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+            analysis = await self.analyzer.get_waiting_time_analysis()
+            return analysis
 
         @self.app.get("/analysis/trends", operation_id="get_trend_analysis")
         async def get_trend_analysis():
@@ -587,142 +704,276 @@ class MCPServer:
             This tool analyzes trends in success rates, competition levels,
             and changes in the lottery system over time.
             """
-            try:
-                analysis = await self.analyzer.get_trend_analysis()
-                return analysis
-            except Exception as e:
-                logger.error(f"Error getting trend analysis: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+            analysis = await self.analyzer.get_trend_analysis()
+            return analysis
     
-    async def _find_relevant_policy_documents(self, question: str, category: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Find policy documents relevant to the user's question."""
+    async def _find_relevant_policy_documents(self, question: str, category: Optional[str] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Find policy documents relevant to the user's question.
+        
+        Returns:
+            The relevant documents, and whether every policy document could
+            be read and searched
+        """
         try:
             policies_dir = self.data_dir / "policies"
             if not policies_dir.exists():
                 logger.warning("No policies directory found")
-                return []
+                return [], True
             
             # Get all policy files
-            policy_files = list(policies_dir.glob("*.md"))
+            policy_files = self._get_policy_files(policies_dir)
             if not policy_files:
                 logger.warning("No policy documents found")
-                return []
+                return [], True
             
             # Keywords from the question
             question_lower = question.lower()
             question_keywords = self._extract_keywords_from_question(question_lower)
             
-            relevant_docs = []
+            documents = []
+            complete = True
             
             for policy_file in policy_files:
                 try:
-                    async with aiofiles.open(policy_file, 'r', encoding='utf-8') as f:
-                        content = await f.read()
-                    
-                    # Calculate relevance score
-                    relevance_score = self._calculate_document_relevance(
-                        content, question_keywords, question_lower, category
-                    )
-                    
-                    if relevance_score > 0:
-                        # Extract key sections related to the question
-                        relevant_sections = self._extract_relevant_sections(content, question_keywords)
-                        
-                        relevant_docs.append({
-                            "filename": policy_file.name,
-                            "path": str(policy_file),
-                            "relevance_score": relevance_score,
-                            "content": content,
-                            "relevant_sections": relevant_sections
-                        })
-                        
+                    documents.append((policy_file, await self._load_policy_document(policy_file)))
                 except Exception as e:
                     logger.error(f"Error reading policy file {policy_file}: {e}")
+                    complete = False
                     continue
             
-            # Sort by relevance score and return top results
-            relevant_docs.sort(key=lambda x: x["relevance_score"], reverse=True)
-            return relevant_docs[:5]  # Return top 5 most relevant documents
+            # Scoring and section extraction are pure CPU work over the loaded
+            # documents, so run them off the event loop
+            relevant_docs = await asyncio.to_thread(
+                self._rank_policy_documents, documents, question_keywords, question_lower, category
+            )
+            return relevant_docs, complete
             
         except Exception as e:
             logger.error(f"Error finding relevant policy documents: {e}")
-            return []
+            return [], False
+    
+    def _rank_policy_documents(
+        self,
+        documents: List[Tuple[Path, Dict[str, Any]]],
+        keywords: List[str],
+        question: str,
+        category: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Score loaded policy documents and extract sections from the most relevant ones.
+        
+        Args:
+            documents: (path, cached document) pairs
+            keywords: Keywords extracted from the question
+            question: Lowercased question
+            category: Optional policy category
+            
+        Returns:
+            Up to POLICY_TOP_DOCUMENTS documents, most relevant first
+        """
+        scored_docs = []
+        
+        for policy_file, document in documents:
+            relevance_score = self._calculate_document_relevance(document, keywords, question, category)
+            if relevance_score > 0:
+                scored_docs.append((relevance_score, policy_file, document))
+        
+        # Keep only the most relevant documents, then extract key sections
+        # related to the question from those alone
+        top_docs = heapq.nlargest(POLICY_TOP_DOCUMENTS, scored_docs, key=lambda x: x[0])
+        
+        relevant_docs = []
+        for relevance_score, policy_file, document in top_docs:
+            content = document["content"]
+            relevant_docs.append({
+                "filename": policy_file.name,
+                "path": str(policy_file),
+                "relevance_score": relevance_score,
+                "content": content,
+                "topic_tags": document["topic_tags"],
+                "relevant_sections": self._extract_relevant_sections(content, keywords)
+            })
+        
+        return relevant_docs
+    
+    @staticmethod
+    def _split_winner_results(
+        results: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split search results into winners and high-priority waiting list entries.
+        
+        Returns:
+            Tuple of (non-waiting-list results, waiting list results whose
+            sequence number is within PRIORITY_SEQUENCE_LIMIT)
+        """
+        winner_results = []
+        priority_results = []
+        
+        for result in results:
+            if result["type"] != WAITING_LIST_TYPE:
+                winner_results.append(result)
+            else:
+                sequence_number = result.get("sequence_number")
+                if sequence_number and sequence_number <= PRIORITY_SEQUENCE_LIMIT:
+                    priority_results.append(result)
+        
+        return winner_results, priority_results
+    
+    @staticmethod
+    def _build_policy_automaton() -> ahocorasick.Automaton:
+        """
+        Build an Aho-Corasick automaton over all policy terms.
+        
+        Each term maps to (term, is_keyword): policy keywords and question
+        words are extracted from questions, while related terms are only
+        counted in documents.
+        """
+        keywords = POLICY_KEYWORDS | QUESTION_WORDS
+        related_terms = {term for terms in RELATED_TERMS.values() for term in terms}
+        
+        automaton = ahocorasick.Automaton()
+        for term in keywords | related_terms:
+            automaton.add_word(term, (term, term in keywords))
+        automaton.make_automaton()
+        return automaton
+    
+    def _get_policy_files(self, policies_dir: Path) -> List[Path]:
+        """
+        Get the policy markdown files, rescanning only when the directory changes.
+        
+        Adding, removing or renaming a file updates the directory mtime, so a
+        single stat is enough to tell whether the cached listing is stale.
+        """
+        dir_mtime = policies_dir.stat().st_mtime_ns
+        if dir_mtime != self._policy_dir_mtime:
+            self._policy_files = list(policies_dir.glob("*.md"))
+            self._policy_dir_mtime = dir_mtime
+        return self._policy_files
+    
+    def _get_policy_documents_signature(self) -> Optional[Tuple[Tuple[Path, int], ...]]:
+        """
+        Get the path and mtime of every policy document.
+        
+        Returns None when the documents cannot be listed, in which case
+        answers are neither served from nor stored in the cache.
+        """
+        try:
+            policy_files = self._get_policy_files(self.data_dir / "policies")
+            return tuple(sorted(
+                (policy_file, policy_file.stat().st_mtime_ns) for policy_file in policy_files
+            ))
+        except OSError:
+            return None
+    
+    def _get_cached_policy_answer(
+        self,
+        key: Tuple[str, Optional[str], str],
+        signature: Optional[Tuple[Tuple[Path, int], ...]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached policy explanation, if any.
+        
+        An answer is only reused while the policy documents have the same
+        paths and mtimes as when it was cached, so editing, adding or
+        removing any document makes it stale.
+        """
+        if signature is None:
+            return None
+        
+        cached = self._policy_answers.get(key)
+        if cached is None:
+            return None
+        
+        cached_signature, answer = cached
+        if cached_signature != signature:
+            del self._policy_answers[key]
+            return None
+        
+        self._policy_answers.move_to_end(key)
+        return answer
+    
+    def _cache_policy_answer(
+        self,
+        key: Tuple[str, Optional[str], str],
+        signature: Optional[Tuple[Tuple[Path, int], ...]],
+        answer: Dict[str, Any]
+    ) -> None:
+        """Cache a policy explanation, evicting the least recently used one when full."""
+        if signature is None:
+            return
+        
+        self._policy_answers[key] = (signature, answer)
+        self._policy_answers.move_to_end(key)
+        if len(self._policy_answers) > POLICY_ANSWER_CACHE_SIZE:
+            self._policy_answers.popitem(last=False)
     
     def _extract_keywords_from_question(self, question: str) -> List[str]:
         """Extract keywords from the user's question."""
-        # Common policy-related keywords
-        policy_keywords = [
-            # Application types
-            "个人申请", "家庭申请", "单位申请", "个人", "家庭", "单位", "企业",
-            
-            # Vehicle types
-            "新能源", "普通", "燃油车", "电动车", "纯电动",
-            
-            # Process terms
-            "申请", "摇号", "轮候", "更新", "复核", "审核", "材料", "条件", "流程", "程序",
-            
-            # Requirements
-            "资格", "条件", "要求", "证件", "证明", "驾驶证", "身份证", "居住证", "工作居住证",
-            
-            # Time-related
-            "时间", "期限", "有效期", "申报期", "截止", "多久", "什么时候", "几月",
-            
-            # Results and status
-            "结果", "中签", "获得", "成功", "失败", "等待", "排队",
-            
-            # Documents and procedures
-            "材料", "文件", "手续", "窗口", "办理", "提交", "打印", "下载",
-            
-            # Specific processes
-            "转让", "变更", "过户", "注销", "登记", "被盗", "抢夺"
-        ]
+        # A single automaton pass finds every policy keyword and question word
+        # present in the question, including overlapping ones
+        found_keywords = {
+            term for _, (term, is_keyword) in self._policy_automaton.iter(question)
+            if is_keyword
+        }
+        return list(found_keywords)
+    
+    async def _load_policy_document(self, policy_file: Path) -> Dict[str, Any]:
+        """
+        Load a policy document, reusing the cached copy while the file is unchanged.
         
-        # Find keywords present in the question
-        found_keywords = []
-        for keyword in policy_keywords:
-            if keyword in question:
-                found_keywords.append(keyword)
+        Besides the raw content, the cached entry holds the lowercased content,
+        the occurrence counts of every policy term from a single automaton
+        pass and the topic tags implied by the filename, so answering a
+        question neither re-reads nor re-scans the file.
+        """
+        file_mtime = policy_file.stat().st_mtime_ns
+        cached = self._policy_documents.get(policy_file)
+        if cached is not None and cached["mtime"] == file_mtime:
+            return cached
         
-        # Also extract potential question words
-        question_words = ["如何", "怎么", "什么", "哪些", "多少", "几", "是否", "能否", "可以", "需要"]
-        for word in question_words:
-            if word in question:
-                found_keywords.append(word)
+        async with aiofiles.open(policy_file, 'r', encoding='utf-8') as f:
+            content = await f.read()
         
-        return found_keywords
+        content_lower = content.lower()
+        document = {
+            "mtime": file_mtime,
+            "content": content,
+            "content_lower": content_lower,
+            "topic_tags": frozenset(
+                tag for token, tag in FILENAME_TOPIC_TAGS.items() if token in policy_file.name
+            ),
+            "term_counts": Counter(
+                term for _, (term, _) in self._policy_automaton.iter(content_lower)
+            ),
+        }
+        self._policy_documents[policy_file] = document
+        return document
     
-    def _calculate_document_relevance(self, content: str, keywords: List[str], question: str, category: Optional[str]) -> float:
+    def _calculate_document_relevance(self, document: Dict[str, Any], keywords: List[str], question: str, category: Optional[str]) -> float:
         """Calculate how relevant a document is to the user's question."""
         score = 0.0
-        content_lower = content.lower()
+        term_counts = document["term_counts"]
         
         # Check for direct keyword matches
         for keyword in keywords:
-            count = content_lower.count(keyword)
-            score += count * 2  # Each keyword occurrence adds 2 points
+            score += term_counts[keyword] * 2  # Each keyword occurrence adds 2 points
         
         # Bonus for category match in filename or content
         if category:
             category_lower = category.lower()
-            if category_lower in content_lower:
+            if category_lower in document["content_lower"]:
                 score += 10
         
         # Check for related terms in content
-        related_terms = {
-            "申请": ["提交", "填报", "办理", "登记"],
-            "材料": ["证件", "文件", "证明", "资料"],
-            "条件": ["要求", "资格", "规定"],
-            "流程": ["程序", "步骤", "操作", "办理"],
-            "时间": ["期限", "截止", "有效期", "申报期"]
-        }
-        
-        for main_term, related in related_terms.items():
+        for main_term, related in RELATED_TERMS.items():
             if main_term in question:
                 for related_term in related:
-                    score += content_lower.count(related_term) * 1
+                    score += term_counts[related_term] * 1
         
         # Penalty for very short documents (likely not comprehensive)
-        if len(content) < 1000:
+        if len(document["content"]) < 1000:
             score *= 0.5
         
         return score
@@ -730,28 +981,46 @@ class MCPServer:
     def _extract_relevant_sections(self, content: str, keywords: List[str]) -> List[str]:
         """Extract sections of the document that are most relevant to the question."""
         relevant_sections = []
+        keyword_set = set(keywords)
         
-        # Split content into paragraphs
-        paragraphs = content.split('\n\n')
-        
-        for paragraph in paragraphs:
-            paragraph_lower = paragraph.lower()
+        for paragraph in self._iter_paragraphs(content):
+            # Only substantial paragraphs are worth scanning for keywords
+            cleaned = paragraph.strip()
+            if len(cleaned) <= 100 or cleaned.startswith('*') or cleaned.startswith('---'):
+                continue
             
-            # Count keyword matches in this paragraph
-            keyword_count = sum(1 for keyword in keywords if keyword in paragraph_lower)
+            # One automaton pass finds whether any keyword occurs, stopping
+            # at the first hit
+            has_keyword = any(
+                term in keyword_set
+                for _, (term, _) in self._policy_automaton.iter(cleaned.lower())
+            )
             
-            # If paragraph has relevant keywords and is substantial, include it
-            if keyword_count >= 1 and len(paragraph.strip()) > 100:
-                # Clean up the paragraph
-                cleaned = paragraph.strip()
-                if cleaned and not cleaned.startswith('*') and not cleaned.startswith('---'):
-                    relevant_sections.append(cleaned)
+            if has_keyword:
+                relevant_sections.append(cleaned)
+                
+                # Stop at the top 5 most relevant sections
+                if len(relevant_sections) == 5:
+                    break
         
-        # Return top 5 most relevant sections
-        return relevant_sections[:5]
+        return relevant_sections
+    
+    @staticmethod
+    def _iter_paragraphs(content: str) -> Iterator[str]:
+        """Yield the paragraphs of a document one at a time."""
+        start = 0
+        for match in PARAGRAPH_BREAK_PATTERN.finditer(content):
+            yield content[start:match.start()]
+            start = match.end()
+        yield content[start:]
     
-    async def _generate_policy_explanation(self, question: str, relevant_docs: List[Dict], detail_level: str) -> Dict[str, Any]:
-        """Generate a comprehensive explanation based on relevant documents."""
+    async def _generate_policy_explanation(self, question: str, relevant_docs: List[Dict], detail_level: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Generate a comprehensive explanation based on relevant documents.
+        
+        Returns:
+            The explanation, and False when it is an error message instead
+        """
         try:
             # Combine relevant sections from all documents
             all_relevant_content = []
@@ -773,7 +1042,7 @@ class MCPServer:
                     "confidence": "low",
                     "sources": sources,
                     "related_topics": []
-                }
+                }, True
             
             # Generate answer based on detail level
             answer = self._construct_answer(question, all_relevant_content, detail_level)
@@ -793,7 +1062,7 @@ class MCPServer:
                 "related_topics": related_topics,
                 "actionable_steps": actionable_steps,
                 "important_notes": important_notes
-            }
+            }, True
             
         except Exception as e:
             logger.error(f"Error generating policy explanation: {e}")
@@ -802,130 +1071,124 @@ class MCPServer:
                 "confidence": "low",
                 "sources": [],
                 "related_topics": []
-            }
+            }, False
     
     def _construct_answer(self, question: str, content_sections: List[str], detail_level: str) -> str:
         """Construct a comprehensive answer from relevant content sections."""
-        
-        # Basic structure for the answer
-        answer_parts = []
+        return "".join(self._iter_answer_parts(question, content_sections, detail_level))
+    
+    def _iter_answer_parts(self, question: str, content_sections: List[str], detail_level: str) -> Iterator[str]:
+        """Yield the parts of an answer in order, as they are produced."""
         
         # Identify the type of question
         question_lower = question.lower()
-        
-        if any(word in question_lower for word in ["如何", "怎么", "怎样"]):
-            answer_parts.append("根据政策规定，具体步骤如下：\n")
-        elif any(word in question_lower for word in ["什么", "哪些"]):
-            answer_parts.append("根据政策文件，相关信息如下：\n")
-        elif any(word in question_lower for word in ["需要", "要", "应该"]):
-            answer_parts.append("根据政策要求：\n")
-        else:
-            answer_parts.append("根据相关政策规定：\n")
+        yield next(
+            (header for words, header in ANSWER_HEADERS
+             if any(word in question_lower for word in words)),
+            DEFAULT_ANSWER_HEADER
+        )
         
         # Process content based on detail level
         if detail_level == "basic":
             # Provide a concise summary
-            key_points = []
+            key_point_count = 0
             for section in content_sections[:2]:  # Use top 2 sections
                 # Extract key sentences
-                sentences = section.split('。')
-                for sentence in sentences[:2]:  # First 2 sentences per section
-                    if len(sentence.strip()) > 20:
-                        key_points.append(sentence.strip() + '。')
-            
-            answer_parts.extend(key_points[:3])  # Max 3 key points for basic
+                for sentence in self._first_sentences(section, 2):  # First 2 sentences per section
+                    if len(sentence.strip()) > 20 and key_point_count < 3:  # Max 3 key points for basic
+                        yield sentence.strip() + '。'
+                        key_point_count += 1
             
         elif detail_level == "detailed":
             # Provide comprehensive information
             for i, section in enumerate(content_sections[:4]):  # Use top 4 sections
                 if i > 0:
-                    answer_parts.append(f"\n{i+1}. ")
+                    yield f"\n{i+1}. "
                 
                 # Clean and format the section
-                cleaned_section = self._clean_content_section(section)
-                answer_parts.append(cleaned_section)
+                yield self._clean_content_section(section)
         
         else:  # medium (default)
             # Balanced approach
             for i, section in enumerate(content_sections[:3]):  # Use top 3 sections
                 if i > 0:
-                    answer_parts.append(f"\n\n{i+1}. ")
+                    yield f"\n\n{i+1}. "
                 
                 # Extract important parts
                 cleaned_section = self._clean_content_section(section)
                 # Limit length for medium detail
                 if len(cleaned_section) > 300:
                     cleaned_section = cleaned_section[:300] + "..."
-                answer_parts.append(cleaned_section)
+                yield cleaned_section
         
         # Add closing note
-        answer_parts.append("\n\n*以上信息基于现有政策文档，具体要求请以官方最新政策为准。如有疑问，请咨询12328热线或访问官方网站。*")
+        yield "\n\n*以上信息基于现有政策文档，具体要求请以官方最新政策为准。如有疑问，请咨询12328热线或访问官方网站。*"
+    
+    @staticmethod
+    def _first_sentences(section: str, count: int) -> Iterator[str]:
+        """
+        Yield up to count sentences from the start of a section.
         
-        return "".join(answer_parts)
+        Equivalent to section.split('。')[:count] without splitting the
+        whole section.
+        """
+        start = 0
+        for _ in range(count):
+            end = section.find('。', start)
+            if end == -1:
+                yield section[start:]
+                return
+            yield section[start:end]
+            start = end + 1
     
     def _clean_content_section(self, section: str) -> str:
         """Clean up a content section for presentation."""
         # Remove markdown formatting
-        cleaned = re.sub(r'[#*_]', '', section)
+        cleaned = MARKDOWN_FORMAT_PATTERN.sub('', section)
         
         # Remove URLs and links
-        cleaned = re.sub(r'http[s]?://\S+', '', cleaned)
-        cleaned = re.sub(r'\[([^\]]*)\]\([^\)]*\)', r'\1', cleaned)
+        cleaned = URL_PATTERN.sub('', cleaned)
+        cleaned = MARKDOWN_LINK_PATTERN.sub(r'\1', cleaned)
         
         # Remove extra whitespace
-        cleaned = re.sub(r'\s+', ' ', cleaned)
+        cleaned = WHITESPACE_PATTERN.sub(' ', cleaned)
         
         # Remove system notes
-        cleaned = re.sub(r'\*[^*]*系统.*?\*', '', cleaned)
+        cleaned = SYSTEM_NOTE_PATTERN.sub('', cleaned)
         
         return cleaned.strip()
     
     def _extract_actionable_steps(self, content_sections: List[str]) -> List[str]:
         """Extract actionable steps from the content."""
-        steps = []
+        # Insertion-ordered set of unique steps
+        steps: Dict[str, None] = {}
         
         # Look for numbered lists, step indicators, etc.
-        step_patterns = [
-            r'(\d+)\.?\s*([^。]*申请[^。]*)',
-            r'(\d+)\.?\s*([^。]*提交[^。]*)', 
-            r'(\d+)\.?\s*([^。]*办理[^。]*)',
-            r'(\d+)\.?\s*([^。]*填报[^。]*)',
-            r'第\s*([一二三四五六七八九十]+)\s*[步条]?\s*[：:]?\s*([^。]*)',
-        ]
-        
         for section in content_sections:
-            for pattern in step_patterns:
-                matches = re.findall(pattern, section)
-                for match in matches:
-                    if len(match) >= 2:
-                        step_text = match[1].strip()
-                        if len(step_text) > 10:  # Ensure meaningful content
-                            steps.append(step_text)
-        
-        return steps[:5]  # Return top 5 steps
+            for match in STEP_PATTERN.finditer(section):
+                step_text = (match.group('numbered') or match.group('ordinal')).strip()
+                if len(step_text) > 10:  # Ensure meaningful content
+                    steps[step_text] = None
+                    if len(steps) == 5:  # Return top 5 steps
+                        return list(steps)
+        
+        return list(steps)
     
     def _extract_important_notes(self, content_sections: List[str]) -> List[str]:
         """Extract important notes and warnings from the content."""
-        notes = []
+        # Insertion-ordered set of unique notes
+        notes: Dict[str, None] = {}
         
         # Look for important indicators
-        note_patterns = [
-            r'注意[：:]?\s*([^。]*)',
-            r'重要[：:]?\s*([^。]*)',
-            r'注[：:]?\s*([^。]*)',
-            r'备注[：:]?\s*([^。]*)',
-            r'特别提醒[：:]?\s*([^。]*)',
-        ]
-        
         for section in content_sections:
-            for pattern in note_patterns:
-                matches = re.findall(pattern, section)
-                for match in matches:
-                    note_text = match.strip()
-                    if len(note_text) > 15:  # Ensure meaningful content
-                        notes.append(note_text)
-        
-        return notes[:3]  # Return top 3 notes
+            for match in NOTE_PATTERN.finditer(section):
+                note_text = match.group('note').strip()
+                if len(note_text) > 15:  # Ensure meaningful content
+                    notes[note_text] = None
+                    if len(notes) == 3:  # Return top 3 notes
+                        return list(notes)
+        
+        return list(notes)
     
     def _suggest_related_topics(self, question: str, relevant_docs: List[Dict]) -> List[str]:
         """Suggest related topics based on the question and available documents."""
@@ -950,17 +1213,7 @@ class MCPServer:
                 topics.extend(suggestions)
         
         # Also suggest based on available document types
-        doc_types = set()
-        for doc in relevant_docs:
-            filename = doc["filename"]
-            if "个人申请" in filename:
-                doc_types.add("个人申请相关政策")
-            if "家庭申请" in filename:
-                doc_types.add("家庭申请相关政策")
-            if "材料" in filename:
-                doc_types.add("申请材料清单")
-            if "更新" in filename:
-                doc_types.add("更新指标政策")
+        doc_types = set().union(*(doc["topic_tags"] for doc in relevant_docs))
         
         topics.extend(list(doc_types))
         
@@ -982,6 +1235,9 @@ class MCPServer:
         if self.data_store.total_entries == 0:
             await self._load_example_pdfs()
         
+        # Persist newly loaded results before this event loop goes away
+        await self.data_store.flush()
+        
         logger.info(f"MCP server initialized with {self.data_store.total_entries} total entries")
     
     async def _load_example_pdfs(self):
@@ -992,14 +1248,37 @@ class MCPServer:
             logger.info("No examples directory found, skipping example PDF loading")
             return
         
-        # Load example PDFs
-        for pdf_file in examples_dir.glob("*.pdf"):
+        pdf_files = list(examples_dir.glob("*.pdf"))
+        if not pdf_files:
+            return
+        
+        # Parse example PDFs in parallel; PDF text extraction is pure Python,
+        # so separate processes are needed to use more than one core
+        logger.info(f"Loading {len(pdf_files)} example PDFs")
+        loop = asyncio.get_running_loop()
+        # Workers start from a clean process rather than a fork of this one,
+        # which has a running event loop and executor threads
+        with ProcessPoolExecutor(
+            max_workers=min(len(pdf_files), os.cpu_count() or 1),
+            mp_context=PROCESS_POOL_CONTEXT
+        ) as executor:
+            parsed_results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor, self.pdf_parser.parse_pdf, pdf_file, f"example://{pdf_file.name}"
+                    )
+                    for pdf_file in pdf_files
+                ),
+                return_exceptions=True
+            )
+        
+        # Validate and add to store; writes are batched by the data store
+        for pdf_file, result in zip(pdf_files, parsed_results):
+            if isinstance(result, Exception):
+                logger.error(f"Error loading example PDF {pdf_file}: {result}")
+                continue
+            
             try:
-                logger.info(f"Loading example PDF: {pdf_file}")
-                
-                # Parse PDF
-                result = self.pdf_parser.parse_pdf(pdf_file, f"example://{pdf_file.name}")
-                
                 # Validate and add to store
                 validation_report = self.pdf_parser.validate_parsed_data(result)
                 
@@ -1022,14 +1301,31 @@ class MCPServer:
         }
         run_kwargs.update(kwargs)
         
-        # Initialize server before running
+        # Initialize server before running. With multiple workers this runs
+        # once in the parent so example PDFs are parsed and persisted a single
+        # time; each worker then loads the persisted data on startup.
         asyncio.run(self.initialize())
         
         logger.info(f"Starting MCP server at http://{self.host}:{self.port}")
         logger.info(f"MCP endpoint available at http://{self.host}:{self.port}/mcp")
         logger.info(f"API documentation at http://{self.host}:{self.port}/docs")
         
-        uvicorn.run(self.app, **run_kwargs)
+        if self.workers > 1:
+            logger.info(f"Serving with {self.workers} worker processes")
+            # Workers load the data themselves; the supervising process only
+            # restarts them and has no use for its own copy
+            self.data_store.unload()
+            os.environ[DATA_DIR_ENV] = str(self.data_dir)
+            os.environ[DOWNLOADS_DIR_ENV] = str(self.downloads_dir)
+            os.environ[WORKERS_ENV] = str(self.workers)
+            uvicorn.run(
+                "bjhjyd_mcp.server.mcp_server:build_app",
+                factory=True,
+                workers=self.workers,
+                **run_kwargs
+            )
+        else:
+            uvicorn.run(self.app, **run_kwargs)
 
 
 # Convenience function for creating and running the server
@@ -1041,4 +1337,28 @@ def create_server(**kwargs) -> MCPServer:
 def run_server(**kwargs):
     """Create and run an MCP server."""
     server = create_server(**kwargs)
-    server.run() 
\ No newline at end of file
+    server.run()
+
+
+def build_app() -> FastAPI:
+    """
+    Application factory used by uvicorn when serving with multiple workers.
+    
+    Each worker process builds its own server and loads the data persisted
+    by the parent process before serving requests. Results another worker
+    saves later are merged in by the data store on the next lookup.
+    """
+    server = create_server(
+        data_dir=Path(os.environ.get(DATA_DIR_ENV, "data")),
+        downloads_dir=Path(os.environ.get(DOWNLOADS_DIR_ENV, "downloads")),
+        workers=int(os.environ.get(WORKERS_ENV, "1"))
+    )
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await server.data_store.load_from_disk()
+        async with server._lifespan(app):
+            yield
+    
+    server.app.router.lifespan_context = lifespan
+    return server.app
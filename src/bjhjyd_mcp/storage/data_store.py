@@ -4,16 +4,33 @@ Data storage and management for Beijing car quota lottery results.
 Provides in-memory storage with disk persistence for quota results.
 """
 
+import asyncio
 import json
 import logging
+import os
+import pickle
+import tempfile
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 import aiofiles
+
 from ..models.quota_result import QuotaResult, QuotaType
 
 logger = logging.getLogger(__name__)
 
+# Each result is saved as its own pickle file in the results directory, so
+# worker processes sharing the storage directory only ever write the results
+# they added and only read the ones they have not seen yet
+RESULTS_DIRNAME = "results"
+RESULT_FILE_SUFFIX = ".pickle"
+PICKLE_PROTOCOL = 5
+
+# Delay before pending changes are written to disk, so that results added
+# in quick succession are persisted with a single snapshot write
+FLUSH_DELAY_SECONDS = 1.0
+
 
 class DataStore:
     """In-memory data store with disk persistence for quota results."""
@@ -32,17 +49,31 @@ class DataStore:
         self.quota_results: Dict[str, QuotaResult] = {}
         
         # Index for fast lookups
-        self.application_code_index: Dict[str, List[str]] = {}  # code -> [filenames]
-        self.id_number_index: Dict[str, List[str]] = {}  # partial_id -> [filenames]
+        self.application_code_index: Dict[str, List[str]] = defaultdict(list)  # code -> [filenames]
+        self.id_number_index: Dict[str, List[str]] = defaultdict(list)  # partial_id -> [filenames]
+        self.id_prefix_index: Dict[str, List[str]] = defaultdict(list)  # id_prefix -> [partial_ids]
+        self.id_suffix_index: Dict[str, List[str]] = defaultdict(list)  # id_suffix -> [partial_ids]
         
         # Metadata
         self.last_update: Optional[datetime] = None
         self.total_entries: int = 0
+        
+        # Result files that failed to load, skipped by later lookups
+        self._unreadable_results: Set[str] = set()
+        self._merge_lock = asyncio.Lock()
+        
+        # Pending disk writes
+        self._unsaved: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
     
     async def add_quota_result(self, result: QuotaResult) -> None:
         """
         Add a quota result to the store.
         
+        The result is persisted shortly afterwards by a background flush;
+        call flush() to write it to disk immediately.
+        
         Args:
             result: QuotaResult to add
         """
@@ -60,8 +91,8 @@ class DataStore:
         self.total_entries += result.metadata.entry_count
         
         # Persist to disk
-        await self._save_result_to_disk(result)
-        await self._save_metadata()
+        self._unsaved.add(filename)
+        self._schedule_flush()
         
         logger.info(f"Added {result.metadata.entry_count} entries from {filename}")
     
@@ -70,15 +101,11 @@ class DataStore:
         # Index application codes
         if result.metadata.quota_type == QuotaType.WAITING_LIST:
             for entry in result.waiting_list_entries:
-                if entry.application_code not in self.application_code_index:
-                    self.application_code_index[entry.application_code] = []
                 self.application_code_index[entry.application_code].append(filename)
         
         elif result.metadata.quota_type == QuotaType.SCORE_RANKING:
             for entry in result.score_ranking_entries:
                 # Index application code
-                if entry.application_code not in self.application_code_index:
-                    self.application_code_index[entry.application_code] = []
                 self.application_code_index[entry.application_code].append(filename)
                 
                 # Index partial ID number
@@ -88,7 +115,8 @@ class DataStore:
                     partial_id = f"{id_prefix}****{id_suffix}"
                     
                     if partial_id not in self.id_number_index:
-                        self.id_number_index[partial_id] = []
+                        self.id_prefix_index[id_prefix].append(partial_id)
+                        self.id_suffix_index[id_suffix].append(partial_id)
                     self.id_number_index[partial_id].append(filename)
     
     async def find_by_application_code(self, application_code: str) -> List[Dict[str, Any]]:
@@ -101,6 +129,8 @@ class DataStore:
         Returns:
             List of matching entries with source information
         """
+        await self._refresh_from_disk()
+        
         results = []
         
         if application_code in self.application_code_index:
@@ -128,6 +158,8 @@ class DataStore:
         Returns:
             List of matching entries with source information
         """
+        await self._refresh_from_disk()
+        
         results = []
         partial_id = f"{id_prefix}****{id_suffix}"
         
@@ -156,6 +188,8 @@ class DataStore:
         Returns:
             List of matching entries with source information
         """
+        await self._refresh_from_disk()
+        
         if not id_prefix and not id_suffix:
             return []
         
@@ -165,36 +199,35 @@ class DataStore:
         if id_prefix and id_suffix:
             return await self.find_by_partial_id(id_prefix, id_suffix)
         
-        # Search all indexed ID numbers for matches
-        for partial_id, filenames in self.id_number_index.items():
+        # Look up the indexed ID numbers sharing the given prefix or suffix
+        if id_prefix:
+            partial_ids = self.id_prefix_index.get(id_prefix, [])
+        else:
+            partial_ids = self.id_suffix_index.get(id_suffix, [])
+        
+        for partial_id in partial_ids:
             # partial_id format: "123456****7890"
             current_prefix = partial_id[:6]
             current_suffix = partial_id[-4:]
             
-            # Check if current ID matches search criteria
-            match = False
-            if id_prefix and current_prefix == id_prefix:
-                match = True
-            elif id_suffix and current_suffix == id_suffix:
-                match = True
-            
-            if match:
-                # Get entries from matching files
-                for filename in filenames:
-                    if filename in self.quota_results:
-                        quota_result = self.quota_results[filename]
-                        entry_list = quota_result.find_by_partial_id(current_prefix, current_suffix)
-                        
-                        for entry_data in entry_list:
-                            entry_data["source_file"] = filename
-                            entry_data["source_url"] = quota_result.metadata.source_url
-                            entry_data["download_time"] = quota_result.metadata.download_time
-                            results.append(entry_data)
+            # Get entries from matching files
+            for filename in self.id_number_index[partial_id]:
+                if filename in self.quota_results:
+                    quota_result = self.quota_results[filename]
+                    entry_list = quota_result.find_by_partial_id(current_prefix, current_suffix)
+                    
+                    for entry_data in entry_list:
+                        entry_data["source_file"] = filename
+                        entry_data["source_url"] = quota_result.metadata.source_url
+                        entry_data["download_time"] = quota_result.metadata.download_time
+                        results.append(entry_data)
         
         return results
     
     async def get_statistics(self) -> Dict[str, Any]:
         """Get statistics about stored data."""
+        await self._refresh_from_disk()
+        
         stats = {
             "total_files": len(self.quota_results),
             "total_entries": self.total_entries,
@@ -227,20 +260,24 @@ class DataStore:
         """Load stored results from disk."""
         logger.info("Loading quota results from disk")
         
-        results_dir = self.storage_dir / "results"
+        results_dir = self.storage_dir / RESULTS_DIRNAME
         if not results_dir.exists():
             logger.info("No stored results found")
             return
         
-        loaded_count = 0
+        loaded_count = await self._merge_saved_results()
         
+        # Also load per-file JSON results written by older versions
         for result_file in results_dir.glob("*.json"):
+            if result_file.stem in self.quota_results:
+                continue
+            
             try:
                 async with aiofiles.open(result_file, 'r', encoding='utf-8') as f:
                     data = json.loads(await f.read())
                 
-                # Reconstruct QuotaResult object
-                result = QuotaResult.parse_obj(data)
+                # Reconstruct QuotaResult object from our own trusted output
+                result = QuotaResult.from_trusted_dict(data)
                 
                 # Add to store
                 filename = result.metadata.filename
@@ -258,19 +295,130 @@ class DataStore:
         
         logger.info(f"Loaded {loaded_count} quota results from disk")
     
-    async def _save_result_to_disk(self, result: QuotaResult) -> None:
-        """Save a single result to disk."""
-        results_dir = self.storage_dir / "results"
-        results_dir.mkdir(exist_ok=True)
+    async def flush(self) -> None:
+        """Write any pending changes to disk."""
+        async with self._flush_lock:
+            if not self._unsaved:
+                return
+            
+            filenames, self._unsaved = self._unsaved, set()
+            try:
+                (self.storage_dir / RESULTS_DIRNAME).mkdir(exist_ok=True)
+                for filename in filenames:
+                    result = self.quota_results.get(filename)
+                    if result is not None:
+                        await self._save_result(result)
+                
+                # Keep a later update time saved by another process
+                await self._load_metadata()
+                await self._save_metadata()
+            except Exception:
+                self._unsaved |= filenames
+                raise
+    
+    def _schedule_flush(self) -> None:
+        """Schedule a delayed flush of unsaved results if none is pending."""
+        # A task left over from an event loop that has since closed is done
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after(FLUSH_DELAY_SECONDS))
+    
+    async def _flush_after(self, delay: float) -> None:
+        """Flush pending changes after a delay."""
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            # Cleared even when cancelled, e.g. when asyncio.run() ends with
+            # the flush still pending, so later changes schedule a new one.
+            # Changes made while flushing also schedule a new flush.
+            if self._flush_task is asyncio.current_task():
+                self._flush_task = None
         
-        filename = result.metadata.filename
-        result_file = results_dir / f"{filename}.json"
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error saving data store to disk: {e}")
+    
+    def _result_path(self, filename: str) -> Path:
+        """Get the path a result is saved to."""
+        return self.storage_dir / RESULTS_DIRNAME / f"{filename}{RESULT_FILE_SUFFIX}"
+    
+    async def _refresh_from_disk(self) -> None:
+        """
+        Pick up results other worker processes have saved before a lookup.
         
-        # Convert to dict for JSON serialization
-        data = result.dict()
+        Costs one listing of the results directory when nothing changed. A
+        failed read is logged and the lookup goes ahead with the results
+        already in memory.
+        """
+        try:
+            merged_count = await self._merge_saved_results()
+        except Exception as e:
+            logger.error(f"Error loading results saved by another process: {e}")
+            return
         
-        async with aiofiles.open(result_file, 'w', encoding='utf-8') as f:
-            await f.write(json.dumps(data, ensure_ascii=False, indent=2, default=str))
+        if merged_count:
+            await self._load_metadata()
+            logger.info(f"Merged {merged_count} quota results saved by another process")
+    
+    async def _merge_saved_results(self) -> int:
+        """
+        Load saved results that are not held in memory yet.
+        
+        Only the new result files are read, and they are unpickled off the
+        event loop. Results already held in memory are kept as they are.
+        
+        Returns:
+            Number of results loaded
+        """
+        results_dir = self.storage_dir / RESULTS_DIRNAME
+        async with self._merge_lock:
+            try:
+                names = os.listdir(results_dir)
+            except FileNotFoundError:
+                return 0
+            
+            loaded_count = 0
+            for name in names:
+                if (
+                    not name.endswith(RESULT_FILE_SUFFIX)
+                    or name[:-len(RESULT_FILE_SUFFIX)] in self.quota_results
+                    or name in self._unreadable_results
+                ):
+                    continue
+                
+                result_file = results_dir / name
+                try:
+                    result = await self._read_result(result_file)
+                except Exception as e:
+                    logger.error(f"Error loading result from {result_file}: {e}")
+                    self._unreadable_results.add(name)
+                    continue
+                
+                filename = result.metadata.filename
+                if filename in self.quota_results:
+                    continue
+                self.quota_results[filename] = result
+                self._update_indexes(filename, result)
+                self.total_entries += result.metadata.entry_count
+                loaded_count += 1
+        
+        return loaded_count
+    
+    async def _read_result(self, result_file: Path) -> QuotaResult:
+        """Read a saved result, unpickling it off the event loop."""
+        async with aiofiles.open(result_file, 'rb') as f:
+            payload = await f.read()
+        return await asyncio.to_thread(pickle.loads, payload)
+    
+    async def _save_result(self, result: QuotaResult) -> None:
+        """
+        Save a result to its own pickle file.
+        
+        Pickling runs in a worker thread; stored results are never modified,
+        so lookups and new results can proceed meanwhile.
+        """
+        payload = await asyncio.to_thread(pickle.dumps, result, PICKLE_PROTOCOL)
+        await self._write_atomic(self._result_path(result.metadata.filename), payload)
     
     async def _save_metadata(self) -> None:
         """Save store metadata to disk."""
@@ -282,11 +430,31 @@ class DataStore:
         
         metadata_file = self.storage_dir / "metadata.json"
         
-        async with aiofiles.open(metadata_file, 'w', encoding='utf-8') as f:
-            await f.write(json.dumps(metadata, ensure_ascii=False, indent=2))
+        await self._write_atomic(
+            metadata_file, json.dumps(metadata, ensure_ascii=False).encode('utf-8')
+        )
+    
+    async def _write_atomic(self, path: Path, payload: bytes) -> None:
+        """
+        Write a file atomically.
+        
+        The payload goes to a uniquely named temporary file next to the
+        target, which then replaces it, so readers never see a partially
+        written file and concurrent writers never share a temporary file.
+        """
+        tmp_fd, tmp_name = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        try:
+            async with aiofiles.open(tmp_fd, 'wb') as f:
+                await f.write(payload)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
     
     async def _load_metadata(self) -> None:
-        """Load store metadata from disk."""
+        """Load store metadata from disk, keeping a later update time held in memory."""
         metadata_file = self.storage_dir / "metadata.json"
         
         if not metadata_file.exists():
@@ -297,7 +465,9 @@ class DataStore:
                 metadata = json.loads(await f.read())
             
             if metadata.get("last_update"):
-                self.last_update = datetime.fromisoformat(metadata["last_update"])
+                last_update = datetime.fromisoformat(metadata["last_update"])
+                if self.last_update is None or last_update > self.last_update:
+                    self.last_update = last_update
             
         except Exception as e:
             logger.error(f"Error loading metadata: {e}")
@@ -306,15 +476,19 @@ class DataStore:
         """Clear all stored data."""
         logger.info("Clearing all stored data")
         
-        self.quota_results.clear()
-        self.application_code_index.clear()
-        self.id_number_index.clear()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._unsaved.clear()
+        
+        self.unload()
         self.last_update = None
-        self.total_entries = 0
         
         # Clear disk storage
-        results_dir = self.storage_dir / "results"
+        results_dir = self.storage_dir / RESULTS_DIRNAME
         if results_dir.exists():
+            for result_file in results_dir.glob(f"*{RESULT_FILE_SUFFIX}"):
+                result_file.unlink()
             for result_file in results_dir.glob("*.json"):
                 result_file.unlink()
         
@@ -322,6 +496,21 @@ class DataStore:
         if metadata_file.exists():
             metadata_file.unlink()
     
+    def unload(self) -> None:
+        """
+        Drop the results held in memory, leaving saved results on disk.
+        
+        Unsaved results are dropped too, so flush() first to keep them.
+        A later lookup or load_from_disk() reads the saved results again.
+        """
+        self.quota_results.clear()
+        self.application_code_index.clear()
+        self.id_number_index.clear()
+        self.id_prefix_index.clear()
+        self.id_suffix_index.clear()
+        self.total_entries = 0
+        self._unreadable_results.clear()
+    
     def get_result_by_filename(self, filename: str) -> Optional[QuotaResult]:
         """Get a specific result by filename."""
         return self.quota_results.get(filename)
@@ -5,11 +5,112 @@ Generates beautiful HTML pages with splash effects and animations
 to celebrate users who have won the car quota lottery.
 """
 
+import gzip
 import json
+import os
 import random
-from datetime import datetime
+import tempfile
+from functools import lru_cache
+from datetime import date
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from urllib.parse import quote
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
+from jinja2 import Environment, FileSystemLoader
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+
+class _MinifyingLoader(FileSystemLoader):
+    """
+    Template loader that drops indentation, blank lines and whole-line
+    ``//`` comments from the source before it is compiled.
+    
+    Line breaks are kept, so inline scripts never depend on removed
+    newlines and rendered whitespace between elements is unchanged. Trailing
+    ``//`` comments and CSS/HTML comments are left alone.
+    """
+    
+    def get_source(
+        self, environment: Environment, template: str
+    ) -> Tuple[str, Optional[str], Optional[Callable[[], bool]]]:
+        source, filename, uptodate = super().get_source(environment, template)
+        lines = (line.strip() for line in source.splitlines())
+        minified = "\n".join(line for line in lines if line and not line.startswith("//"))
+        if source.endswith("\n"):
+            minified += "\n"
+        return minified, filename, uptodate
+
+
+# Templates ship with the package and never change at runtime, so they are
+# loaded, minified and compiled once per process. Autoescaping HTML-escapes
+# every interpolated value in one C pass (markupsafe) and leaves the static
+# markup untouched.
+_TEMPLATE_ENV = Environment(
+    loader=_MinifyingLoader(TEMPLATES_DIR),
+    auto_reload=False,
+    autoescape=True,
+    keep_trailing_newline=True
+)
+# tojson still escapes <, >, & and ' for script blocks; keep Chinese readable
+_TEMPLATE_ENV.policies["json.dumps_kwargs"] = {"ensure_ascii": False}
+_CELEBRATION_TEMPLATE = _TEMPLATE_ENV.get_template("celebration.html.j2")
+
+# Headline shown on the celebration page, picked at random
+CELEBRATION_MESSAGES = (
+    "🎉 恭喜您！中签了！🎉",
+    "🚗 您的新能源车梦想成真了！🚗",
+    "🌟 幸运降临！您获得了车牌指标！🌟",
+    "🎊 太棒了！您在摇号中获胜！🎊",
+    "✨ 好运连连！车牌指标属于您了！✨"
+)
+
+# Share text templates, picked at random and filled in for the winner
+SHARING_MESSAGES = (
+    "我在北京新能源车摇号中中签了！申请编码：{application_code}",
+    "好消息！我获得了{lottery_type}！",
+    "经过漫长等待，终于中签了！{lottery_type}到手！",
+    "分享一个好消息：我的{lottery_type}申请成功了！"
+)
+
+# Dedicated generator for message picks, independent of the global one
+_random = random.Random()
+
+# Number of winners whose sharing links are kept
+SHARING_LINKS_CACHE_SIZE = 1024
+
+# Write buffer for saved pages; a whole page fits, so it goes out in one write
+SAVE_BUFFER_SIZE = 64 * 1024
+
+# Compression level for pages saved with a .gz suffix; level 1 already gets
+# most of the size reduction on repetitive markup at a fraction of the time
+SAVE_GZIP_LEVEL = 1
+
+# Formatted date shown on pages, kept as (day ordinal, label) until midnight
+_today_label_cache: Tuple[int, str] = (0, "")
+
+
+def _today_label() -> str:
+    """Return today's date as 2024年01月31日, formatting it once per day."""
+    global _today_label_cache
+    today = date.today()
+    ordinal = today.toordinal()
+    if _today_label_cache[0] != ordinal:
+        _today_label_cache = (ordinal, f"{today.year}年{today.month:02d}月{today.day:02d}日")
+    return _today_label_cache[1]
+
+
+@lru_cache(maxsize=SHARING_LINKS_CACHE_SIZE)
+def _sharing_links(application_code: str) -> Tuple[Tuple[str, str], ...]:
+    """Build the sharing links for one application code, URL-encoded once."""
+    share_text = f"我在北京新能源车摇号中中签了！申请编码：{application_code}"
+    encoded_text = quote(share_text, safe='')
+    
+    return (
+        ("wechat", "weixin://"),  # WeChat sharing requires special handling
+        ("weibo", f"https://service.weibo.com/share/share.php?title={encoded_text}"),
+        ("qq", f"https://connect.qq.com/widget/shareqq/index.html?title={encoded_text}"),
+        ("copy", share_text)
+    )
 
 
 class CelebrationGenerator:
@@ -17,25 +118,25 @@ class CelebrationGenerator:
     
     def __init__(self):
         """Initialize the celebration generator."""
-        self.templates_dir = Path(__file__).parent / "templates"
-        self.templates_dir.mkdir(exist_ok=True)
+        self.templates_dir = TEMPLATES_DIR
     
     def generate_celebration_page(
         self,
         winner_info: Dict[str, Any],
         lottery_results: List[Dict[str, Any]],
         save_path: Optional[Path] = None
-    ) -> str:
+    ) -> Optional[str]:
         """
         Generate a celebration HTML page for a lottery winner.
         
         Args:
             winner_info: Information about the winner (application code, name, etc.)
             lottery_results: List of lottery results for this winner
-            save_path: Optional path to save the HTML file
+            save_path: Optional path to save the HTML file (gzip-compressed
+                if it ends in .gz)
             
         Returns:
-            HTML content as string
+            HTML content as string, or None when the page was streamed to save_path
         """
         # Extract winner details
         application_code = winner_info.get("application_code", "")
@@ -46,8 +147,8 @@ class CelebrationGenerator:
         lottery_type = self._determine_lottery_type(lottery_results)
         lottery_details = self._extract_lottery_details(lottery_results)
         
-        # Generate HTML content
-        html_content = self._create_html_template(
+        # Render HTML content lazily, chunk by chunk
+        html_chunks = self._iter_html_chunks(
             application_code=application_code,
             name=name,
             id_info=id_info,
@@ -55,13 +156,39 @@ class CelebrationGenerator:
             lottery_details=lottery_details
         )
         
-        # Save to file if path provided
+        # Stream to file if path provided, without building the whole page;
+        # a .gz suffix saves the page gzip-compressed
         if save_path:
             save_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(save_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            self._write_page(save_path, html_chunks)
+            return None
+        
+        return "".join(html_chunks)
+    
+    def _write_page(self, save_path: Path, html_chunks: Iterator[str]) -> None:
+        """
+        Write rendered chunks to save_path atomically.
         
-        return html_content
+        The page goes to a uniquely named temporary file next to the target,
+        which then replaces it, so a render failing partway leaves no
+        truncated page behind.
+        """
+        tmp_fd, tmp_name = tempfile.mkstemp(
+            dir=save_path.parent, prefix=f".{save_path.name}.", suffix=".tmp"
+        )
+        try:
+            with open(tmp_fd, "wb", buffering=SAVE_BUFFER_SIZE) as f:
+                if save_path.suffix == ".gz":
+                    with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=SAVE_GZIP_LEVEL) as gz:
+                        for chunk in html_chunks:
+                            gz.write(chunk.encode("utf-8"))
+                else:
+                    for chunk in html_chunks:
+                        f.write(chunk.encode("utf-8"))
+            os.replace(tmp_name, save_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
     
     def _determine_lottery_type(self, lottery_results: List[Dict[str, Any]]) -> str:
         """Determine the type of lottery based on results."""
@@ -94,428 +221,47 @@ class CelebrationGenerator:
             "total_results": len(lottery_results)
         }
     
-    def _create_html_template(
+    def _iter_html_chunks(
         self,
         application_code: str,
         name: str,
         id_info: str,
         lottery_type: str,
         lottery_details: Dict[str, Any]
-    ) -> str:
-        """Create the HTML template with celebration effects."""
-        
-        # Generate random celebration messages
-        celebration_messages = [
-            "🎉 恭喜您！中签了！🎉",
-            "🚗 您的新能源车梦想成真了！🚗",
-            "🌟 幸运降临！您获得了车牌指标！🌟",
-            "🎊 太棒了！您在摇号中获胜！🎊",
-            "✨ 好运连连！车牌指标属于您了！✨"
-        ]
+    ) -> Iterator[str]:
+        """Render the celebration page template as a stream of HTML chunks."""
         
-        main_message = random.choice(celebration_messages)
+        # Pick a random celebration message
+        main_message = _random.choice(CELEBRATION_MESSAGES)
         
         # Format date
-        current_date = datetime.now().strftime("%Y年%m月%d日")
-        
-        # Create sharing messages
-        sharing_messages = [
-            f"我在北京新能源车摇号中中签了！申请编码：{application_code}",
-            f"好消息！我获得了{lottery_type}！",
-            f"经过漫长等待，终于中签了！{lottery_type}到手！",
-            f"分享一个好消息：我的{lottery_type}申请成功了！"
-        ]
-        
-        share_text = random.choice(sharing_messages)
-        
-        html_content = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🎉 中签庆祝 - {name}</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'PingFang SC', 'Hiragino Sans GB', 'Microsoft YaHei', sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            overflow-x: hidden;
-            position: relative;
-        }}
-        
-        /* Celebration animations */
-        .firework {{
-            position: absolute;
-            width: 6px;
-            height: 6px;
-            border-radius: 50%;
-            animation: firework 2s ease-out infinite;
-        }}
-        
-        @keyframes firework {{
-            0% {{
-                opacity: 1;
-                transform: scale(0) translateY(0);
-            }}
-            50% {{
-                opacity: 1;
-                transform: scale(1) translateY(-100px);
-            }}
-            100% {{
-                opacity: 0;
-                transform: scale(0) translateY(-200px);
-            }}
-        }}
-        
-        .confetti {{
-            position: absolute;
-            width: 8px;
-            height: 8px;
-            background: #ff6b6b;
-            animation: confetti 3s ease-in-out infinite;
-        }}
-        
-        @keyframes confetti {{
-            0% {{
-                transform: translateY(-100vh) rotate(0deg);
-                opacity: 1;
-            }}
-            100% {{
-                transform: translateY(100vh) rotate(720deg);
-                opacity: 0;
-            }}
-        }}
-        
-        .sparkle {{
-            position: absolute;
-            width: 4px;
-            height: 4px;
-            background: #ffd700;
-            border-radius: 50%;
-            animation: sparkle 1.5s ease-in-out infinite;
-        }}
-        
-        @keyframes sparkle {{
-            0%, 100% {{
-                opacity: 0;
-                transform: scale(0);
-            }}
-            50% {{
-                opacity: 1;
-                transform: scale(1);
-            }}
-        }}
-        
-        /* Main content */
-        .container {{
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 2rem;
-            text-align: center;
-            position: relative;
-            z-index: 10;
-        }}
-        
-        .celebration-card {{
-            background: rgba(255, 255, 255, 0.95);
-            border-radius: 20px;
-            padding: 3rem 2rem;
-            margin: 2rem 0;
-            box-shadow: 0 20px 40px rgba(0, 0, 0, 0.1);
-            backdrop-filter: blur(10px);
-            animation: cardAppear 0.8s ease-out;
-        }}
-        
-        @keyframes cardAppear {{
-            from {{
-                opacity: 0;
-                transform: translateY(50px) scale(0.9);
-            }}
-            to {{
-                opacity: 1;
-                transform: translateY(0) scale(1);
-            }}
-        }}
-        
-        .main-title {{
-            font-size: 2.5rem;
-            color: #2c3e50;
-            margin-bottom: 1rem;
-            text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.1);
-            animation: pulse 2s ease-in-out infinite;
-        }}
-        
-        @keyframes pulse {{
-            0%, 100% {{
-                transform: scale(1);
-            }}
-            50% {{
-                transform: scale(1.05);
-            }}
-        }}
+        current_date = _today_label()
         
-        .lottery-type {{
-            font-size: 1.5rem;
-            color: #8e44ad;
-            margin-bottom: 2rem;
-            font-weight: 600;
-        }}
-        
-        .details-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 1.5rem;
-            margin: 2rem 0;
-        }}
-        
-        .detail-card {{
-            background: linear-gradient(135deg, #f8f9fa, #e9ecef);
-            border-radius: 15px;
-            padding: 1.5rem;
-            border: 2px solid #dee2e6;
-            transition: transform 0.3s ease;
-        }}
-        
-        .detail-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 10px 20px rgba(0, 0, 0, 0.1);
-        }}
-        
-        .detail-label {{
-            font-size: 0.9rem;
-            color: #6c757d;
-            margin-bottom: 0.5rem;
-            font-weight: 500;
-        }}
-        
-        .detail-value {{
-            font-size: 1.2rem;
-            color: #2c3e50;
-            font-weight: 600;
-        }}
-        
-        .action-buttons {{
-            margin-top: 3rem;
-            display: flex;
-            gap: 1rem;
-            justify-content: center;
-            flex-wrap: wrap;
-        }}
-        
-        .btn {{
-            padding: 12px 30px;
-            border: none;
-            border-radius: 25px;
-            font-size: 1rem;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            text-decoration: none;
-            display: inline-block;
-        }}
-        
-        .btn-primary {{
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-        }}
-        
-        .btn-secondary {{
-            background: linear-gradient(135deg, #ffecd2, #fcb69f);
-            color: #8e44ad;
-        }}
-        
-        .btn:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 8px 15px rgba(0, 0, 0, 0.2);
-        }}
-        
-        .footer {{
-            margin-top: 3rem;
-            color: rgba(255, 255, 255, 0.8);
-            font-size: 0.9rem;
-        }}
-        
-        /* Responsive design */
-        @media (max-width: 600px) {{
-            .container {{
-                padding: 1rem;
-            }}
-            
-            .main-title {{
-                font-size: 2rem;
-            }}
-            
-            .details-grid {{
-                grid-template-columns: 1fr;
-            }}
-            
-            .action-buttons {{
-                flex-direction: column;
-                align-items: center;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <!-- Celebration effects -->
-    <div id="celebration-effects"></div>
-    
-    <div class="container">
-        <div class="celebration-card">
-            <h1 class="main-title">{main_message}</h1>
-            <div class="lottery-type">{lottery_type}</div>
-            
-            <div class="details-grid">
-                <div class="detail-card">
-                    <div class="detail-label">申请编码</div>
-                    <div class="detail-value">{application_code}</div>
-                </div>
-                
-                <div class="detail-card">
-                    <div class="detail-label">中签日期</div>
-                    <div class="detail-value">{current_date}</div>
-                </div>
-                
-                {f'''
-                <div class="detail-card">
-                    <div class="detail-label">序号</div>
-                    <div class="detail-value">{lottery_details.get("sequence_number", "N/A")}</div>
-                </div>
-                ''' if lottery_details.get("sequence_number") else ""}
-                
-                {f'''
-                <div class="detail-card">
-                    <div class="detail-label">排队时间</div>
-                    <div class="detail-value">{lottery_details.get("waiting_time", "N/A")[:10] if lottery_details.get("waiting_time") else "N/A"}</div>
-                </div>
-                ''' if lottery_details.get("waiting_time") else ""}
-            </div>
-            
-            <div class="action-buttons">
-                <button class="btn btn-primary" onclick="shareNews()">
-                    📱 分享好消息
-                </button>
-                <button class="btn btn-secondary" onclick="downloadPage()">
-                    💾 保存纪念页
-                </button>
-                <button class="btn btn-secondary" onclick="printPage()">
-                    🖨️ 打印纪念
-                </button>
-            </div>
-        </div>
-        
-        <div class="footer">
-            <p>🎊 祝贺您获得北京新能源小客车指标！🎊</p>
-            <p>请及时关注后续购车和上牌流程</p>
-        </div>
-    </div>
-    
-    <script>
-        // Create celebration effects
-        function createCelebrationEffects() {{
-            const effectsContainer = document.getElementById('celebration-effects');
-            
-            // Create fireworks
-            for (let i = 0; i < 20; i++) {{
-                const firework = document.createElement('div');
-                firework.className = 'firework';
-                firework.style.left = Math.random() * 100 + '%';
-                firework.style.background = `hsl(${{Math.random() * 360}}, 70%, 60%)`;
-                firework.style.animationDelay = Math.random() * 2 + 's';
-                effectsContainer.appendChild(firework);
-            }}
-            
-            // Create confetti
-            for (let i = 0; i < 30; i++) {{
-                const confetti = document.createElement('div');
-                confetti.className = 'confetti';
-                confetti.style.left = Math.random() * 100 + '%';
-                confetti.style.background = `hsl(${{Math.random() * 360}}, 70%, 60%)`;
-                confetti.style.animationDelay = Math.random() * 3 + 's';
-                confetti.style.animationDuration = (Math.random() * 2 + 2) + 's';
-                effectsContainer.appendChild(confetti);
-            }}
-            
-            // Create sparkles
-            for (let i = 0; i < 50; i++) {{
-                const sparkle = document.createElement('div');
-                sparkle.className = 'sparkle';
-                sparkle.style.left = Math.random() * 100 + '%';
-                sparkle.style.top = Math.random() * 100 + '%';
-                sparkle.style.animationDelay = Math.random() * 1.5 + 's';
-                effectsContainer.appendChild(sparkle);
-            }}
-        }}
-        
-        // Share functionality
-        function shareNews() {{
-            const shareText = "{share_text}";
-            
-            if (navigator.share) {{
-                navigator.share({{
-                    title: '🎉 北京车牌中签啦！',
-                    text: shareText,
-                    url: window.location.href
-                }});
-            }} else {{
-                // Fallback - copy to clipboard
-                navigator.clipboard.writeText(shareText).then(() => {{
-                    alert('好消息已复制到剪贴板！快去分享吧！');
-                }});
-            }}
-        }}
-        
-        // Download page as image (simplified)
-        function downloadPage() {{
-            window.print();
-        }}
-        
-        // Print page
-        function printPage() {{
-            window.print();
-        }}
+        # Pick a sharing message and fill in only that one
+        share_text = _random.choice(SHARING_MESSAGES).format(
+            application_code=application_code,
+            lottery_type=lottery_type
+        )
         
-        // Add sound effect (optional)
-        function playSuccessSound() {{
-            const audio = new Audio('data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEAQB8AAEAfAAABAAgAZGF0YQoGAACBhYqFbF1fdJivrJBhNjVgodDbq2EcBj+a2/LDciUFLIHO8tiJNwgZaLvt559NEAxQp+PwtmMcBjiR1/LMeSwFJHfH8N2QQAoUXrTp66hVFApGn+DyvmwbCy3BxuPzgl0gGJPXy+iKUB8aN');
-            audio.play().catch(() => {{}}); // Ignore errors
-        }}
+        # Optional detail cards; the waiting time may be a datetime or an
+        # ISO string, and only its date part is shown
+        sequence_number = lottery_details.get("sequence_number")
+        waiting_time = lottery_details.get("waiting_time")
+        waiting_date = str(waiting_time)[:10] if waiting_time else None
         
-        // Initialize effects when page loads
-        document.addEventListener('DOMContentLoaded', function() {{
-            createCelebrationEffects();
-            playSuccessSound();
-            
-            // Add additional effects after a delay
-            setTimeout(() => {{
-                document.querySelector('.celebration-card').style.transform = 'scale(1.02)';
-                setTimeout(() => {{
-                    document.querySelector('.celebration-card').style.transform = 'scale(1)';
-                }}, 200);
-            }}, 1000);
-        }});
-    </script>
-</body>
-</html>
-        """
-        
-        return html_content
+        # The template only reads these plain values, with no lookups or
+        # filters of its own
+        return _CELEBRATION_TEMPLATE.generate(
+            name=name,
+            main_message=main_message,
+            lottery_type=lottery_type,
+            application_code=application_code,
+            current_date=current_date,
+            sequence_number=sequence_number,
+            waiting_date=waiting_date,
+            share_text=share_text
+        )
     
     def create_sharing_links(self, winner_info: Dict[str, Any]) -> Dict[str, str]:
         """Create social media sharing links."""
-        application_code = winner_info.get("application_code", "")
-        share_text = f"我在北京新能源车摇号中中签了！申请编码：{application_code}"
-        
-        return {
-            "wechat": f"weixin://",  # WeChat sharing requires special handling
-            "weibo": f"https://service.weibo.com/share/share.php?title={share_text}",
-            "qq": f"https://connect.qq.com/widget/shareqq/index.html?title={share_text}",
-            "copy": share_text
-        } 
\ No newline at end of file
+        return dict(_sharing_links(winner_info.get("application_code", "")))
@@ -0,0 +1,62 @@
+"""Unit tests for celebration page generation."""
+
+import pytest
+from unittest.mock import Mock
+
+from bjhjyd_mcp.utils import celebration_generator
+from bjhjyd_mcp.utils.celebration_generator import CelebrationGenerator
+
+
+class TestCelebrationGenerator:
+    """Test celebration page rendering."""
+
+    @pytest.fixture(autouse=True)
+    def first_messages(self, monkeypatch):
+        """Always pick the first message, whose share text includes the application code."""
+        monkeypatch.setattr(celebration_generator._random, "choice", lambda messages: messages[0])
+
+    def test_winner_details_are_escaped(self):
+        """Test that winner details cannot break out of the HTML or the share script."""
+        winner_info = {
+            "application_code": '12345"</script>',
+            "name": "<script>"
+        }
+
+        html = CelebrationGenerator().generate_celebration_page(winner_info, [])
+
+        assert "<title>🎉 中签庆祝 - &lt;script&gt;</title>" in html
+        assert '<div class="detail-value">12345&#34;&lt;/script&gt;</div>' in html
+        assert (
+            'const shareText = "我在北京新能源车摇号中中签了！申请编码：12345\\"\\u003c/script\\u003e";'
+            in html
+        )
+
+    def test_save_recreates_removed_directory(self, tmp_path):
+        """Test that saving still works after the output directory is removed."""
+        generator = CelebrationGenerator()
+        save_path = tmp_path / "celebrations" / "page.html"
+
+        generator.generate_celebration_page({"application_code": "1"}, [], save_path=save_path)
+        save_path.unlink()
+        save_path.parent.rmdir()
+        generator.generate_celebration_page({"application_code": "1"}, [], save_path=save_path)
+
+        assert save_path.exists()
+
+    def test_failed_render_leaves_no_file(self, tmp_path, monkeypatch):
+        """Test that a render failing partway does not leave a truncated page."""
+        def failing_render(**context):
+            yield "<!DOCTYPE html>"
+            raise RuntimeError("render failed")
+
+        monkeypatch.setattr(
+            celebration_generator, "_CELEBRATION_TEMPLATE", Mock(generate=failing_render)
+        )
+        save_path = tmp_path / "page.html"
+
+        with pytest.raises(RuntimeError):
+            CelebrationGenerator().generate_celebration_page(
+                {"application_code": "1"}, [], save_path=save_path
+            )
+
+        assert list(tmp_path.iterdir()) == []
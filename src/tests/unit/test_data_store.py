@@ -0,0 +1,130 @@
+"""Unit tests for data store persistence."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from bjhjyd_mcp.models.quota_result import (
+    PDFMetadata, QuotaResult, QuotaType, WaitingListEntry
+)
+from bjhjyd_mcp.storage import data_store
+from bjhjyd_mcp.storage.data_store import DataStore
+
+
+def make_result(filename: str, application_code: str) -> QuotaResult:
+    """Create a one-entry waiting list result."""
+    metadata = PDFMetadata(
+        filename=filename,
+        source_url="http://example.com",
+        download_time=datetime(2024, 1, 1),
+        file_size=1000,
+        page_count=1,
+        entry_count=1,
+        quota_type=QuotaType.WAITING_LIST
+    )
+    return QuotaResult(
+        metadata=metadata,
+        waiting_list_entries=[
+            WaitingListEntry(
+                sequence_number=1,
+                application_code=application_code,
+                waiting_time=datetime(2018, 1, 7, 14, 56, 11, 401000)
+            )
+        ]
+    )
+
+
+class TestDataStorePersistence:
+    """Test delayed flushing of the data store to disk."""
+
+    @pytest.fixture(autouse=True)
+    def short_flush_delay(self, monkeypatch):
+        """Flush pending changes quickly."""
+        monkeypatch.setattr(data_store, "FLUSH_DELAY_SECONDS", 0.01)
+
+    def test_flush_scheduled_after_event_loop_exit(self, tmp_path):
+        """Test that changes after a loop exits with a pending flush still persist."""
+        store = DataStore(tmp_path)
+
+        async def add_and_exit():
+            # Leaves the delayed flush pending; asyncio.run cancels it
+            await store.add_quota_result(make_result("first.pdf", "1111111111111"))
+            await store.flush()
+            await store.add_quota_result(make_result("second.pdf", "2222222222222"))
+
+        async def add_and_wait():
+            await store.add_quota_result(make_result("third.pdf", "3333333333333"))
+            await asyncio.sleep(0.2)
+
+        asyncio.run(add_and_exit())
+        asyncio.run(add_and_wait())
+
+        reloaded = DataStore(tmp_path)
+        asyncio.run(reloaded.load_from_disk())
+
+        assert sorted(reloaded.list_filenames()) == ["first.pdf", "second.pdf", "third.pdf"]
+
+    def test_flush_keeps_results_saved_by_another_process(self, tmp_path):
+        """Test that stores sharing a directory do not overwrite each other's results."""
+        first = DataStore(tmp_path)
+        second = DataStore(tmp_path)
+
+        async def add_to_both():
+            await first.add_quota_result(make_result("first.pdf", "1111111111111"))
+            await first.flush()
+            await second.add_quota_result(make_result("second.pdf", "2222222222222"))
+            await second.flush()
+            await first.add_quota_result(make_result("third.pdf", "3333333333333"))
+            await first.flush()
+
+        asyncio.run(add_to_both())
+
+        reloaded = DataStore(tmp_path)
+        asyncio.run(reloaded.load_from_disk())
+
+        assert sorted(reloaded.list_filenames()) == ["first.pdf", "second.pdf", "third.pdf"]
+        assert reloaded.total_entries == 3
+        assert not list(tmp_path.rglob("*.tmp"))
+
+    def test_lookup_sees_results_saved_by_another_process(self, tmp_path):
+        """Test that a lookup picks up results another store has saved."""
+        reader = DataStore(tmp_path)
+        writer = DataStore(tmp_path)
+
+        async def save_then_search():
+            await writer.add_quota_result(make_result("refreshed.pdf", "4444444444444"))
+            await writer.flush()
+            return await reader.find_by_application_code("4444444444444")
+
+        matches = asyncio.run(save_then_search())
+
+        assert len(matches) == 1
+        assert matches[0]["source_file"] == "refreshed.pdf"
+
+    def test_lookup_loads_only_new_results(self, tmp_path, monkeypatch):
+        """Test that a lookup reads only the results saved since the last one."""
+        reader = DataStore(tmp_path)
+        writer = DataStore(tmp_path)
+        read_files = []
+        read_result = DataStore._read_result
+
+        async def record_read(store, result_file):
+            read_files.append(result_file.name)
+            return await read_result(store, result_file)
+
+        monkeypatch.setattr(DataStore, "_read_result", record_read)
+
+        async def save_and_search():
+            await writer.add_quota_result(make_result("first.pdf", "1111111111111"))
+            await writer.flush()
+            await reader.find_by_application_code("1111111111111")
+            await writer.add_quota_result(make_result("second.pdf", "2222222222222"))
+            await writer.flush()
+            await reader.find_by_application_code("2222222222222")
+            await reader.find_by_application_code("2222222222222")
+
+        asyncio.run(save_and_search())
+
+        assert read_files == ["first.pdf.pickle", "second.pdf.pickle"]
+        assert reader.total_entries == 2
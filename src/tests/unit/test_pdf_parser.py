@@ -3,7 +3,9 @@
 import pytest
 from datetime import datetime
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
+
+import pypdfium2 as pdfium
 
 from bjhjyd_mcp.parsers.pdf_parser import PDFParser, PDFFormatDetector
 from bjhjyd_mcp.models.quota_result import QuotaType
@@ -54,7 +56,11 @@ class TestPDFParser:
     def parser(self):
         """Create a PDF parser instance."""
         return PDFParser()
-    
+
+    def test_default_parser_is_shared(self):
+        """Test that the default parser is created once and reused."""
+        assert PDFParser.default() is PDFParser.default()
+
     def test_waiting_list_pattern_matching(self, parser):
         """Test waiting list regex pattern."""
         test_line = "1 87861015821462018-01-07 14:56:11.401"
@@ -101,7 +107,23 @@ class TestPDFParser:
         assert entries[1].sequence_number == 2
         assert entries[1].application_code == "9520106831497"
         assert entries[1].waiting_time == datetime(2018, 1, 14, 3, 54, 54, 765000)
-    
+
+    def test_parse_entry_timestamps(self, parser):
+        """Test timestamp parsing with padded milliseconds and wide spacing."""
+        raw_entries = [
+            "1 8786101582146 2018-01-07 14:56:11.009",
+            "2 95201068314972018-01-14  03:54:54.765",
+            "3 1437100439239 2019-02-29 20:35:11.000"
+        ]
+
+        entries = parser._parse_waiting_list_entries(raw_entries)
+
+        # The invalid date on the last line is skipped, as strptime did
+        assert len(entries) == 2
+        assert entries[0].waiting_time == datetime(2018, 1, 7, 14, 56, 11, 9000)
+        assert entries[1].application_code == "9520106831497"
+        assert entries[1].waiting_time == datetime(2018, 1, 14, 3, 54, 54, 765000)
+
     def test_parse_score_ranking_entries(self, parser):
         """Test parsing score ranking entries."""
         raw_entries = [
@@ -169,4 +191,85 @@ class TestPDFParser:
         report = parser.validate_parsed_data(result)
         
         assert report["is_valid"] is False
-        assert "No valid entries found in PDF" in report["errors"] 
\ No newline at end of file
+        assert "No valid entries found in PDF" in report["errors"] 
+
+
+WAITING_LIST_PAGE = (
+    "序号 申请编码 轮候时间\r\n"
+    "1 8786101582146 2018-01-07 14:56:11.401\r\n"
+    "2 9520106831497 2018-01-14 03:54:54.765\r\n"
+)
+
+
+def mock_pdfium_document(page_texts):
+    """Create a mock PDFium document whose pages have the given text."""
+    pages = []
+    for text in page_texts:
+        page = Mock()
+        page.get_textpage.return_value.get_text_range.return_value = text
+        pages.append(page)
+    
+    document = MagicMock()
+    document.__len__.return_value = len(pages)
+    document.__getitem__.side_effect = pages.__getitem__
+    return document
+
+
+def mock_pdfplumber_pages(mock_pdfplumber, page_texts):
+    """Make the mocked pdfplumber open a PDF whose pages have the given text."""
+    pages = [Mock(**{"extract_text.return_value": text}) for text in page_texts]
+    mock_pdfplumber.open.return_value.__enter__.return_value.pages = pages
+
+
+@patch('bjhjyd_mcp.parsers.pdf_parser.pdfplumber')
+@patch('bjhjyd_mcp.parsers.pdf_parser.pdfium.PdfDocument')
+class TestPDFiumParsing:
+    """Test reading PDF text through PDFium and falling back to pdfplumber."""
+    
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        """Create a placeholder PDF file for the result metadata."""
+        path = tmp_path / "wl.pdf"
+        path.write_bytes(b"%PDF-1.4")
+        return path
+    
+    def test_parse_pdf_with_pdfium(self, mock_document, mock_pdfplumber, pdf_path):
+        """Test parsing PDFium text with CRLF line endings."""
+        mock_document.return_value = mock_pdfium_document([WAITING_LIST_PAGE])
+        
+        result = PDFParser().parse_pdf(pdf_path)
+        
+        assert result.metadata.quota_type == QuotaType.WAITING_LIST
+        assert result.metadata.page_count == 1
+        assert [entry.application_code for entry in result.waiting_list_entries] == [
+            "8786101582146", "9520106831497"
+        ]
+        assert result.waiting_list_entries[1].waiting_time == datetime(2018, 1, 14, 3, 54, 54, 765000)
+        mock_document.return_value.close.assert_called_once()
+        mock_pdfplumber.open.assert_not_called()
+    
+    @pytest.mark.parametrize("pdfium_text", [
+        "This is some random text without quota indicators",
+        "序号 申请编码 轮候时间\r\n",
+    ])
+    def test_fallback_without_entries(self, mock_document, mock_pdfplumber, pdf_path, pdfium_text):
+        """Test falling back to pdfplumber on an unknown format or no entries."""
+        mock_document.return_value = mock_pdfium_document([pdfium_text])
+        mock_pdfplumber_pages(mock_pdfplumber, [WAITING_LIST_PAGE.replace("\r\n", "\n")])
+        
+        result = PDFParser().parse_pdf(pdf_path)
+        
+        assert len(result.waiting_list_entries) == 2
+        mock_pdfplumber.open.assert_called_once_with(pdf_path)
+    
+    def test_fallback_on_text_read_error(self, mock_document, mock_pdfplumber, pdf_path):
+        """Test falling back to pdfplumber when PDFium fails to read a page."""
+        document = mock_pdfium_document([WAITING_LIST_PAGE])
+        document[0].get_textpage.return_value.get_text_range.side_effect = pdfium.PdfiumError("Failed")
+        mock_document.return_value = document
+        mock_pdfplumber_pages(mock_pdfplumber, [WAITING_LIST_PAGE.replace("\r\n", "\n")])
+        
+        result = PDFParser().parse_pdf(pdf_path)
+        
+        assert len(result.waiting_list_entries) == 2
+        document.close.assert_called_once()
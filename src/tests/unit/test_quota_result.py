@@ -0,0 +1,29 @@
+"""Unit tests for quota result models."""
+
+from datetime import datetime
+
+from bjhjyd_mcp.models.quota_result import WaitingListEntry
+
+
+class TestEntryFieldsSet:
+    """Test the fields-set shared by parsed entries."""
+
+    def test_validated_entries_report_all_fields(self):
+        """Test that validated entries report every field as set."""
+        entries = [
+            WaitingListEntry(
+                sequence_number=number,
+                application_code="8786101582146",
+                waiting_time=datetime(2018, 1, 7, 14, 56, 11, 401000)
+            )
+            for number in (1, 2)
+        ]
+
+        assert entries[0].model_fields_set == {"sequence_number", "application_code", "waiting_time"}
+        assert entries[0].model_fields_set is entries[1].model_fields_set
+
+    def test_partially_constructed_entry_keeps_its_fields_set(self):
+        """Test that model_construct() with fields left out reports only those it got."""
+        entry = WaitingListEntry.model_construct(sequence_number=1)
+
+        assert entry.model_fields_set == {"sequence_number"}
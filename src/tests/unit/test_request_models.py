@@ -0,0 +1,33 @@
+"""Unit tests for request model validation."""
+
+import pytest
+from pydantic import ValidationError
+
+from bjhjyd_mcp.server.mcp_server import IDSearchRequest
+
+
+class TestIDSearchRequest:
+    """Test ID search request validation."""
+
+    def test_empty_string_counts_as_not_provided(self):
+        """Test that an empty suffix leaves a prefix-only search."""
+        request = IDSearchRequest(id_prefix="110228", id_suffix="")
+
+        assert request.id_prefix == "110228"
+        assert request.id_suffix is None
+
+    def test_lowercase_check_digit_is_uppercased(self):
+        """Test that a lowercase x check digit matches the indexed X."""
+        request = IDSearchRequest(id_suffix="124x")
+
+        assert request.id_suffix == "124X"
+
+    @pytest.mark.parametrize("fields", [
+        {"id_prefix": "11022"},
+        {"id_prefix": "11022a"},
+        {"id_suffix": "12X4"},
+    ])
+    def test_malformed_values_are_rejected(self, fields):
+        """Test that values of the wrong length or format are rejected."""
+        with pytest.raises(ValidationError):
+            IDSearchRequest(**fields)